@@ -1,14 +1,21 @@
 from django.contrib import admin
+from django.db import transaction
+from django.template.response import TemplateResponse
+from django.urls import path
 from .models import (
     Questionnaire, Question, QuestionOption, AssessmentResponse, 
-    QuestionResponse, AssessmentResult, UserProgress
+    QuestionResponse, AssessmentResult, UserProgress, UserAssessmentStats,
+    DailyAssessmentRollup
 )
+from .analytics import DEFAULT_TREND_DAYS, daily_trend, questionnaire_summary
+from .export import assessment_csv_response, export_assessments_for_answers
+from .submissions import RollupScope, rebuild_rollups
 
 
 @admin.register(Questionnaire)
 class QuestionnaireAdmin(admin.ModelAdmin):
-    list_display = ['name', 'is_active', 'created_at']
-    list_filter = ['is_active', 'created_at']
+    list_display = ['name', 'scoring_algorithm', 'is_active', 'created_at']
+    list_filter = ['is_active', 'scoring_algorithm', 'created_at']
     search_fields = ['name', 'description']
     ordering = ['-created_at']
 
@@ -20,13 +27,23 @@ class QuestionOptionInline(admin.TabularInline):
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ['text', 'questionnaire', 'question_type', 'order', 'is_required']
-    list_filter = ['question_type', 'is_required', 'questionnaire']
+    list_display = ['text', 'questionnaire', 'question_type', 'dimension', 'order', 'is_required']
+    list_filter = ['question_type', 'dimension', 'is_required', 'questionnaire']
     search_fields = ['text']
     ordering = ['questionnaire', 'order']
     inlines = [QuestionOptionInline]
 
 
+@admin.action(description='Export selected assessments with answers as CSV')
+def export_assessments_csv(modeladmin, request, queryset):
+    return assessment_csv_response(queryset)
+
+
+@admin.action(description='Export the assessments of selected answers as CSV')
+def export_answer_assessments_csv(modeladmin, request, queryset):
+    return export_assessments_for_answers(queryset)
+
+
 @admin.register(AssessmentResponse)
 class AssessmentResponseAdmin(admin.ModelAdmin):
     list_display = ['user', 'questionnaire', 'risk_level', 'total_score', 'completed_at']
@@ -34,6 +51,17 @@ class AssessmentResponseAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email', 'session_id']
     ordering = ['-completed_at']
     readonly_fields = ['completed_at', 'ip_address']
+    actions = [export_assessments_csv]
+    
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, AssessmentResponse.objects.filter(pk=obj.pk))
+    
+    def delete_queryset(self, request, queryset):
+        # Deleted assessments must stop counting in the statistics and rollups
+        with transaction.atomic():
+            rollups = RollupScope().add(queryset)
+            super().delete_queryset(request, queryset)
+            rebuild_rollups(rollups)
 
 
 @admin.register(QuestionResponse)
@@ -41,6 +69,7 @@ class QuestionResponseAdmin(admin.ModelAdmin):
     list_display = ['assessment', 'question', 'score', 'scale_value']
     list_filter = ['assessment__risk_level', 'question__question_type']
     search_fields = ['assessment__user__username', 'question__text']
+    actions = [export_answer_assessments_csv]
 
 
 @admin.register(AssessmentResult)
@@ -56,3 +85,58 @@ class UserProgressAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['user__username']
     ordering = ['-created_at']
+
+
+@admin.register(UserAssessmentStats)
+class UserAssessmentStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'assessment_count', 'last_score', 'last_risk_level', 'last_completed_at']
+    list_filter = ['last_risk_level']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(DailyAssessmentRollup)
+class DailyAssessmentRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'questionnaire', 'risk_level', 'count', 'score_sum']
+    list_filter = ['risk_level', 'questionnaire']
+    date_hierarchy = 'day'
+    change_list_template = 'admin/assessment/dailyassessmentrollup/change_list.html'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'analytics/',
+                self.admin_site.admin_view(self.analytics_view),
+                name='assessment_dailyassessmentrollup_analytics',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def analytics_view(self, request):
+        """Platform usage over the last ``?days=`` days, read from the rollups."""
+        try:
+            days = max(1, min(int(request.GET.get('days', DEFAULT_TREND_DAYS)), 366))
+        except ValueError:
+            days = DEFAULT_TREND_DAYS
+        
+        trend = daily_trend(days)
+        peak = max((entry['count'] for entry in trend), default=0) or 1
+        for entry in trend:
+            entry['bar_width'] = round(entry['count'] * 100 / peak)
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Assessment analytics',
+            'days': days,
+            'trend': trend,
+            'summary': questionnaire_summary(days),
+            'total_count': sum(entry['count'] for entry in trend),
+        }
+        return TemplateResponse(request, 'admin/assessment/analytics.html', context)
@@ -0,0 +1,206 @@
+"""
+Population analytics over daily assessment rollups.
+
+``DailyAssessmentRollup`` keeps, per (day, questionnaire, risk level), the
+assessment count and the sum and sum of squares of the scores. These are
+additive, so the write path bumps them with every submission and any range
+or slice is answered by summing a few hundred rollup rows: mean and standard
+deviation follow from the three moments without touching the raw responses.
+"""
+from datetime import timedelta
+import math
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AssessmentResponse, DailyAssessmentRollup
+
+DEFAULT_TREND_DAYS = 90
+RISK_LEVELS = [risk_level for risk_level, _ in AssessmentResponse.RISK_LEVELS]
+
+
+def _rollup_filter(day, questionnaire_id, risk_level):
+    if questionnaire_id is None:
+        return DailyAssessmentRollup.objects.filter(day=day, questionnaire__isnull=True, risk_level=risk_level)
+    return DailyAssessmentRollup.objects.filter(day=day, questionnaire_id=questionnaire_id, risk_level=risk_level)
+
+
+def record_daily_rollups(submissions):
+    """
+    Add new submissions to the daily rollups.
+
+    Must run inside the transaction that stores the submissions.
+    """
+    deltas = {}
+    for submission in submissions:
+        key = (timezone.localdate(submission.completed_at), submission.questionnaire_id, submission.risk_level)
+        count, score_sum, score_sq_sum = deltas.get(key, (0, 0, 0))
+        score = submission.total_score
+        deltas[key] = (count + 1, score_sum + score, score_sq_sum + score * score)
+
+    for (day, questionnaire_id, risk_level), (count, score_sum, score_sq_sum) in deltas.items():
+        increment = {
+            'count': F('count') + count,
+            'score_sum': F('score_sum') + score_sum,
+            'score_sq_sum': F('score_sq_sum') + score_sq_sum,
+        }
+        if _rollup_filter(day, questionnaire_id, risk_level).update(**increment):
+            continue
+        try:
+            with transaction.atomic():
+                DailyAssessmentRollup.objects.create(
+                    day=day, questionnaire_id=questionnaire_id, risk_level=risk_level,
+                    count=count, score_sum=score_sum, score_sq_sum=score_sq_sum,
+                )
+        except IntegrityError:
+            # Another writer created the row first
+            _rollup_filter(day, questionnaire_id, risk_level).update(**increment)
+
+
+def rebuild_daily_rollups(since=None, days=None):
+    """
+    Recompute the daily rollups from the assessment history.
+
+    Args:
+        since (date): Only rebuild days from this date on (defaults to all)
+        days (iterable): Only rebuild these days
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    assessments = AssessmentResponse.objects.all()
+    rollups = DailyAssessmentRollup.objects.all()
+    if since is not None:
+        assessments = assessments.filter(completed_at__date__gte=since)
+        rollups = rollups.filter(day__gte=since)
+    if days is not None:
+        days = list(days)
+        assessments = assessments.filter(completed_at__date__in=days)
+        rollups = rollups.filter(day__in=days)
+    rollups.delete()
+
+    rows = (
+        assessments.annotate(day=TruncDate('completed_at'))
+        .values('day', 'questionnaire_id', 'risk_level')
+        .annotate(
+            count=Count('id'),
+            score_sum=Sum('total_score'),
+            score_sq_sum=Sum(F('total_score') * F('total_score')),
+        )
+        .order_by()
+    )
+
+    batch = [DailyAssessmentRollup(**row) for row in rows]
+    DailyAssessmentRollup.objects.bulk_create(batch, batch_size=1000)
+    return len(batch)
+
+
+def _moments(count, score_sum, score_sq_sum):
+    """Mean and population standard deviation from the summed moments."""
+    if not count:
+        return None, None
+    mean = score_sum / count
+    variance = max(score_sq_sum / count - mean * mean, 0)
+    return round(mean, 2), round(math.sqrt(variance), 2)
+
+
+def _filter_rollups(start, end, questionnaire_id=None, quick=False):
+    rollups = DailyAssessmentRollup.objects.filter(day__gte=start, day__lte=end)
+    if quick:
+        return rollups.filter(questionnaire__isnull=True)
+    if questionnaire_id is not None:
+        return rollups.filter(questionnaire_id=questionnaire_id)
+    return rollups
+
+
+def _moment_sums():
+    # Aliased so they do not shadow the fields summed by _risk_sums()
+    return {
+        'total_count': Sum('count'),
+        'total_score_sum': Sum('score_sum'),
+        'total_score_sq_sum': Sum('score_sq_sum'),
+    }
+
+
+def _risk_sums():
+    return {
+        f'{risk_level}_count': Sum('count', filter=Q(risk_level=risk_level))
+        for risk_level in RISK_LEVELS
+    }
+
+
+def daily_trend(days=DEFAULT_TREND_DAYS, questionnaire_id=None, quick=False, today=None):
+    """
+    Per-day assessment counts, risk mix and score statistics.
+
+    Args:
+        days (int): Length of the window, ending today
+        questionnaire_id (int): Only include this questionnaire
+        quick (bool): Only include quick assessments
+
+    Returns:
+        list: One dict per day (oldest first), days without assessments included
+    """
+    end = today or timezone.localdate()
+    start = end - timedelta(days=days - 1)
+
+    rows = (
+        _filter_rollups(start, end, questionnaire_id, quick)
+        .values('day')
+        .annotate(
+            **_moment_sums(),
+            **_risk_sums(),
+        )
+        .order_by()
+    )
+    by_day = {row['day']: row for row in rows}
+
+    trend = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = by_day.get(day, {})
+        count = row.get('total_count') or 0
+        mean, stddev = _moments(count, row.get('total_score_sum') or 0, row.get('total_score_sq_sum') or 0)
+        entry = {'day': day.isoformat(), 'count': count, 'mean_score': mean, 'stddev_score': stddev}
+        for risk_level in RISK_LEVELS:
+            entry[f'{risk_level}_count'] = row.get(f'{risk_level}_count') or 0
+        trend.append(entry)
+    return trend
+
+
+def questionnaire_summary(days=DEFAULT_TREND_DAYS, today=None):
+    """
+    Totals per questionnaire over the window.
+
+    Returns:
+        list: One dict per questionnaire (quick assessments have ``questionnaire_id`` None)
+    """
+    end = today or timezone.localdate()
+    start = end - timedelta(days=days - 1)
+
+    rows = (
+        _filter_rollups(start, end)
+        .values('questionnaire_id', 'questionnaire__name')
+        .annotate(
+            **_moment_sums(),
+            **_risk_sums(),
+        )
+        .order_by('-total_count')
+    )
+
+    summary = []
+    for row in rows:
+        mean, stddev = _moments(row['total_count'], row['total_score_sum'], row['total_score_sq_sum'])
+        entry = {
+            'questionnaire_id': row['questionnaire_id'],
+            'name': row['questionnaire__name'] or 'Quick Assessment',
+            'count': row['total_count'],
+            'mean_score': mean,
+            'stddev_score': stddev,
+        }
+        for risk_level in RISK_LEVELS:
+            entry[f'{risk_level}_count'] = row[f'{risk_level}_count'] or 0
+        summary.append(entry)
+    return summary
@@ -0,0 +1,142 @@
+"""
+REST API views for questionnaires, results and offline submissions.
+
+Registered under ``/api/v1/`` by ``core.api_urls``. Every queryset is
+shaped for its serializer: counts are annotated, related rows are joined or
+prefetched, and only the serialized columns are loaded.
+"""
+from django.db.models import Count, Prefetch
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import permissions, status, viewsets
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .batch import submit_batch
+from .etags import (
+    questionnaire_detail_etag, questionnaire_list_etag, questionnaire_list_last_modified, user_history_etag,
+    user_history_last_modified, user_result_etag,
+)
+from .models import AssessmentResponse, Question, QuestionOption, Questionnaire
+from .pagination import MAX_PAGE_SIZE
+from .serializers import (
+    AssessmentResultDetailSerializer, AssessmentResultSerializer, QuestionnaireDetailSerializer,
+    QuestionnaireSerializer, SubmissionBatchSerializer, SubmissionItemSerializer,
+)
+
+QUESTIONNAIRE_FIELDS = (
+    'id', 'name', 'description', 'scoring_algorithm', 'min_possible_score', 'max_possible_score', 'updated_at',
+)
+
+
+class QuestionnairePagination(CursorPagination):
+    ordering = ('id',)
+    page_size_query_param = 'limit'
+    max_page_size = MAX_PAGE_SIZE
+
+
+@method_decorator(
+    condition(etag_func=questionnaire_list_etag, last_modified_func=questionnaire_list_last_modified), name='list'
+)
+@method_decorator(condition(etag_func=questionnaire_detail_etag), name='retrieve')
+class QuestionnaireViewSet(viewsets.ReadOnlyModelViewSet):
+    """Active questionnaires; the detail view nests the questions and their options."""
+
+    pagination_class = QuestionnairePagination
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        queryset = (
+            Questionnaire.objects.filter(is_active=True)
+            .annotate(question_count=Count('questions'))
+            .only(*QUESTIONNAIRE_FIELDS)
+        )
+        if self.action == 'retrieve':
+            options = QuestionOption.objects.only('id', 'question_id', 'text', 'value', 'order')
+            questions = Question.objects.only(
+                'id', 'questionnaire_id', 'text', 'question_type', 'dimension', 'order', 'is_required'
+            ).prefetch_related(Prefetch('options', queryset=options))
+            queryset = queryset.prefetch_related(Prefetch('questions', queryset=questions))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return QuestionnaireDetailSerializer
+        return QuestionnaireSerializer
+
+
+class ResultPagination(CursorPagination):
+    """Newest first, without the ``COUNT`` and ``OFFSET`` of page numbers."""
+
+    ordering = ('-completed_at', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = MAX_PAGE_SIZE
+
+
+@method_decorator(condition(etag_func=user_history_etag, last_modified_func=user_history_last_modified), name='list')
+@method_decorator(condition(etag_func=user_result_etag), name='retrieve')
+class AssessmentResultViewSet(viewsets.ReadOnlyModelViewSet):
+    """The logged-in user's assessment results; the detail view adds the percentile."""
+
+    pagination_class = ResultPagination
+
+    def get_queryset(self):
+        return (
+            AssessmentResponse.objects.filter(user=self.request.user)
+            .select_related('questionnaire')
+            .only(
+                'id', 'questionnaire_id', 'questionnaire__name', 'total_score', 'subscale_scores', 'risk_level',
+                'completed_at',
+            )
+        )
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return AssessmentResultDetailSerializer
+        return AssessmentResultSerializer
+
+
+class SubmissionBatchView(APIView):
+    """
+    Upload assessments completed offline: ``{"submissions": [...]}``.
+
+    Each submission is ``{"key", "questionnaire", "completed_at", "answers"}``
+    where ``answers`` maps question ids to option ids (a list for multiple
+    choice) or scale values, or for a quick assessment (``questionnaire``
+    null) maps ``mood``, ``sleep``, ``stress``, ``social`` and ``energy`` to
+    1-5. The response lists a status per submission, in order: ``created``
+    or ``duplicate`` with the assessment id, or ``invalid`` with the errors.
+    """
+
+    def post(self, request):
+        batch = SubmissionBatchSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+
+        items = []
+        envelope_errors = {}
+        for index, data in enumerate(batch.validated_data['submissions']):
+            item = SubmissionItemSerializer(data=data)
+            if item.is_valid():
+                items.append(item.validated_data)
+            else:
+                envelope_errors[index] = item.errors
+
+        results = submit_batch(request.user, items)
+
+        # Slot the envelope errors back in at their positions
+        valid = iter(results)
+        response = []
+        for index, data in enumerate(batch.validated_data['submissions']):
+            if index in envelope_errors:
+                response.append({
+                    'key': data.get('key'), 'status': 'invalid', 'id': None, 'errors': envelope_errors[index],
+                })
+            else:
+                result = next(valid)
+                response.append({
+                    'key': result.key, 'status': result.status, 'id': result.assessment_id, 'errors': result.errors,
+                })
+
+        created = any(item['status'] == 'created' for item in response)
+        return Response({'results': response}, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
@@ -5,5 +5,9 @@ app_name = 'assessment_api'
 
 urlpatterns = [
     path('assessments/', views.assessment_api_list, name='assessment_list'),
+    path('results/batch/', views.assessment_api_results_batch, name='results_batch'),
     path('results/<int:assessment_id>/', views.assessment_api_result, name='assessment_result'),
+    path('analytics/daily/', views.assessment_api_analytics, name='analytics_daily'),
+    path('history/', views.assessment_api_history, name='history'),
+    path('history/series/', views.assessment_api_history_series, name='history_series'),
 ]
@@ -0,0 +1,139 @@
+"""
+In-memory index of the active AssessmentResult score bands.
+
+The bands are loaded into a sorted interval index per risk level, so finding
+the result for a score is a bisect over every band instead of a scan, and a
+lookup never queries the bands table. Each process keeps one index, tagged
+with the band version stored in the cache. The AssessmentResult signal
+handlers bump that version, so with a shared cache every worker reloads on
+its next lookup. The index is also reloaded after ``INDEX_TTL`` seconds,
+which bounds staleness with a per-process cache or after edits that bypass
+the signals.
+"""
+from bisect import bisect_right
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import AssessmentResult
+
+logger = logging.getLogger(__name__)
+
+_index = None
+_index_lock = threading.Lock()
+
+VERSION_CACHE_KEY = 'assessment:result_bands:version'
+INDEX_TTL = 60
+
+
+class ResultBandIndex:
+    """Sorted interval index of result bands, one per risk level."""
+
+    def __init__(self, bands, version=None, expires_at=None):
+        """
+        Args:
+            bands (iterable): Active ``AssessmentResult`` objects
+            version: Band version (from the cache) the bands were loaded at
+            expires_at (float): ``time.monotonic()`` after which the index is reloaded
+        """
+        self.version = version
+        self.expires_at = expires_at
+        self.starts = {}
+        self.bands = {}
+        self.problems = []
+
+        by_level = {}
+        for band in bands:
+            by_level.setdefault(band.risk_level, []).append(band)
+
+        for risk_level, level_bands in by_level.items():
+            level_bands.sort(key=lambda band: (band.min_score, band.max_score))
+            self.bands[risk_level] = level_bands
+            self.starts[risk_level] = [band.min_score for band in level_bands]
+            self.problems.extend(self._check(risk_level, level_bands))
+
+    @staticmethod
+    def _check(risk_level, bands):
+        """Report bands of the same risk level that overlap or leave gaps."""
+        problems = []
+        for band in bands:
+            if band.min_score > band.max_score:
+                problems.append(f'{risk_level}: band "{band.title}" has min_score above max_score')
+        for previous, current in zip(bands, bands[1:]):
+            if current.min_score <= previous.max_score:
+                problems.append(
+                    f'{risk_level}: bands "{previous.title}" and "{current.title}" overlap '
+                    f'({previous.min_score}-{previous.max_score} and {current.min_score}-{current.max_score})'
+                )
+            elif current.min_score > previous.max_score + 1:
+                problems.append(
+                    f'{risk_level}: no band covers scores {previous.max_score + 1}-{current.min_score - 1}'
+                )
+        return problems
+
+    def lookup(self, risk_level, score):
+        """
+        Find the result band for a risk level and score.
+
+        A score that falls outside every band of its risk level resolves to
+        the nearest band, so a misconfigured table degrades to the closest
+        advice instead of none at all.
+
+        Returns:
+            AssessmentResult: The matching band, or None if the risk level has no bands
+        """
+        bands = self.bands.get(risk_level)
+        if not bands:
+            return None
+
+        index = bisect_right(self.starts[risk_level], score) - 1
+        if index < 0:
+            return bands[0]
+
+        band = bands[index]
+        if score > band.max_score and index + 1 < len(bands):
+            following = bands[index + 1]
+            if following.min_score - score < score - band.max_score:
+                return following
+        return band
+
+
+def _is_current(index, version, now):
+    return index is not None and index.version == version and now < index.expires_at
+
+
+def get_result_band_index():
+    """Return the process-wide result band index, reloading it if the bands changed or it expired."""
+    global _index
+    version = cache.get(VERSION_CACHE_KEY)
+    now = time.monotonic()
+    index = _index
+    if _is_current(index, version, now):
+        return index
+
+    with _index_lock:
+        if not _is_current(_index, version, now):
+            _index = ResultBandIndex(AssessmentResult.objects.filter(is_active=True), version, now + INDEX_TTL)
+            for problem in _index.problems:
+                logger.warning('Assessment result bands misconfigured: %s', problem)
+        return _index
+
+
+def _bump_result_band_version():
+    global _index
+    cache.set(VERSION_CACHE_KEY, time.time_ns(), None)
+    with _index_lock:
+        _index = None
+
+
+def invalidate_result_band_index():
+    """
+    Make every process reload its index once the current transaction commits.
+
+    Bumping the version before the commit would let another worker reload
+    the old bands under the new version.
+    """
+    transaction.on_commit(_bump_result_band_version)
@@ -0,0 +1,182 @@
+"""
+Batched submissions from offline clients.
+
+A client that collected several assessments offline uploads them in one
+request. Each item carries the client's idempotency key and its original
+completion time. Items are validated with the same forms and scored with the
+same plans as the web flow, then every new item is written in one
+transaction through ``write_submissions()``. If a concurrent upload stored
+some of the same keys first, the items are retried in a savepoint each,
+still within that transaction, and the ones that conflict are duplicates.
+
+The stored ``submission_key`` is derived from the user and the client key,
+so keys cannot collide across users and a retried upload finds the rows it
+already wrote with one lookup, without writing anything.
+"""
+from collections import namedtuple
+from datetime import timedelta
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .forms import QuickAssessmentForm, get_assessment_form_class
+from .models import AssessmentResponse, Questionnaire
+from .scoring import QUICK_ASSESSMENT_ITEMS, get_quick_scoring_plan, get_scoring_plan
+from .submissions import Submission, write_submissions
+from .utils import calculate_risk_level
+
+MAX_BATCH_SUBMISSIONS = 100
+
+# Devices clocks drift; completion times further ahead than this are rejected
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+# Quick assessment answers are keyed by dimension: {"mood": 4, "sleep": 3, ...}
+QUICK_ANSWER_FIELDS = {dimension: field_name for field_name, dimension, _ in QUICK_ASSESSMENT_ITEMS}
+
+BatchItemResult = namedtuple('BatchItemResult', ['key', 'status', 'assessment_id', 'errors'])
+
+
+class InvalidBatchItem(ValueError):
+    """Raised with the validation errors of one batch item."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def client_submission_key(user_id, client_key):
+    """The stored submission key of a client key, namespaced by user."""
+    return hashlib.sha256(f'{user_id}:client:{client_key}'.encode()).hexdigest()
+
+
+def score_batch_item(item, user, questionnaires):
+    """
+    Validate one item with its form and against its scoring plan's item bounds, then score it.
+
+    Args:
+        item (dict): ``key``, ``questionnaire`` (id, or None for a quick
+            assessment), ``completed_at`` (aware datetime) and ``answers``
+        user: The uploading user
+        questionnaires (dict): Active questionnaires referenced by the batch, by id
+
+    Returns:
+        Submission: The scored, unsaved submission
+
+    Raises:
+        InvalidBatchItem: If the item does not validate
+    """
+    if item['completed_at'] > timezone.now() + MAX_CLOCK_SKEW:
+        raise InvalidBatchItem({'completed_at': ['Completion time is in the future.']})
+
+    answers = item['answers']
+    questionnaire = None
+    if item['questionnaire'] is None:
+        field_names = QUICK_ANSWER_FIELDS
+        form = QuickAssessmentForm({field_names[key]: answers.get(key) for key in field_names})
+        plan = get_quick_scoring_plan()
+    else:
+        questionnaire = questionnaires.get(item['questionnaire'])
+        if questionnaire is None:
+            raise InvalidBatchItem({'questionnaire': ['Unknown or inactive questionnaire.']})
+        form_class = get_assessment_form_class(questionnaire)
+        field_names = {name.removeprefix('question_'): name for name in form_class.base_fields}
+        form = form_class(questionnaire, {
+            field_names[key]: value for key, value in answers.items() if key in field_names
+        })
+        plan = get_scoring_plan(questionnaire)
+
+    # Report errors under the client's answer keys, not the form's field names
+    answer_keys = {name: key for key, name in field_names.items()}
+    if not form.is_valid():
+        raise InvalidBatchItem({
+            'answers': {answer_keys.get(name, name): list(messages) for name, messages in form.errors.items()}
+        })
+
+    # The plan's item bounds are what the stored score bounds assume; nothing may fall outside them
+    values, scored_answers = plan.answer_values(form.cleaned_data)
+    out_of_range = {
+        answer_keys.get(name, name): [f'Must be between {low} and {high}.']
+        for name, value, (low, high) in zip(plan.field_names, values, plan.item_bounds)
+        if form.cleaned_data.get(name) not in (None, '', []) and not low <= value <= high
+    }
+    if out_of_range:
+        raise InvalidBatchItem({'answers': out_of_range})
+
+    total_score, subscales = plan.score_values(values)
+    return Submission(
+        total_score=total_score,
+        risk_level=calculate_risk_level(total_score, questionnaire),
+        questionnaire_id=questionnaire.pk if questionnaire else None,
+        user_id=user.pk,
+        answers=scored_answers,
+        subscales=subscales,
+        submission_key=client_submission_key(user.pk, item['key']),
+        completed_at=item['completed_at'],
+    )
+
+
+def _existing_assessments(submission_keys):
+    return dict(
+        AssessmentResponse.objects.filter(submission_key__in=submission_keys).values_list('submission_key', 'id')
+    )
+
+
+def submit_batch(user, items):
+    """
+    Validate, score and persist a batch of a user's submissions.
+
+    Items whose key was already stored (by an earlier upload or earlier in
+    this batch) are reported as duplicates and not written again.
+
+    Args:
+        user: The uploading user
+        items (list): Envelope-validated items (see ``score_batch_item()``)
+
+    Returns:
+        list: A ``BatchItemResult`` per item, in order; ``status`` is
+        ``created``, ``duplicate`` or ``invalid``
+    """
+    questionnaire_ids = {item['questionnaire'] for item in items if item['questionnaire'] is not None}
+    questionnaires = Questionnaire.objects.filter(is_active=True).in_bulk(questionnaire_ids)
+
+    keys = [client_submission_key(user.pk, item['key']) for item in items]
+    existing = _existing_assessments(keys)
+
+    outcomes = []
+    pending = {}
+    for item, submission_key in zip(items, keys):
+        if submission_key in existing or submission_key in pending:
+            outcomes.append(('duplicate', submission_key, None))
+            continue
+        try:
+            pending[submission_key] = score_batch_item(item, user, questionnaires)
+        except InvalidBatchItem as exc:
+            outcomes.append(('invalid', submission_key, exc.errors))
+        else:
+            outcomes.append(('created', submission_key, None))
+
+    created = {}
+    if pending:
+        with transaction.atomic():
+            try:
+                assessments = write_submissions(list(pending.values()))
+            except IntegrityError:
+                # A concurrent retry of the same upload won the race: keep what
+                # it stored and write the rest, one savepoint per item
+                assessments = []
+                for submission in pending.values():
+                    try:
+                        assessments.extend(write_submissions([submission]))
+                    except IntegrityError:
+                        pass
+                existing = _existing_assessments(keys)
+        created = {assessment.submission_key: assessment.pk for assessment in assessments}
+        existing.update(created)
+
+    results = []
+    for item, (status, submission_key, errors) in zip(items, outcomes):
+        if status == 'created' and submission_key not in created:
+            status = 'duplicate'
+        results.append(BatchItemResult(item['key'], status, existing.get(submission_key), errors))
+    return results
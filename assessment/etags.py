@@ -0,0 +1,179 @@
+"""
+Version checks for conditional GET on the JSON API.
+
+Each function answers "what version of this response would be built?" from
+a cheap query (an aggregate over an indexed column or a single rollup row)
+and is passed to ``django.views.decorators.http.condition``. A client
+sending a matching ``If-None-Match`` or ``If-Modified-Since`` gets an empty
+304 without the view building the payload. Query parameters that change the
+payload (cursor, limit, points...) are part of every ETag, and so is the
+negotiated format: a MessagePack body never matches a JSON body's ETag.
+"""
+from datetime import timedelta
+from functools import wraps
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from core.renderers import wants_msgpack
+
+from .models import AssessmentResponse, DailyAssessmentRollup, Questionnaire, UserAssessmentStats
+from .percentiles import score_percentile
+
+
+def make_etag(*parts):
+    """Strong ETag value for the given version parts."""
+    return hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def per_format(etag_func):
+    """Give each negotiated format of a response its own ETag."""
+    @wraps(etag_func)
+    def wrapper(request, *args, **kwargs):
+        etag = etag_func(request, *args, **kwargs)
+        if etag is not None and wants_msgpack(request):
+            etag = f'{etag}-msgpack'
+        return etag
+    return wrapper
+
+
+def _query_parts(request, names):
+    return [request.GET.get(name, '') for name in names]
+
+
+def _per_request(request, name, compute):
+    """Compute a version once per request (the ETag and Last-Modified checks share it)."""
+    attribute = f'_etag_{name}'
+    if not hasattr(request, attribute):
+        setattr(request, attribute, compute())
+    return getattr(request, attribute)
+
+
+def _active_questionnaires_version(request):
+    return _per_request(request, 'questionnaires', lambda: Questionnaire.objects.filter(is_active=True).aggregate(
+        count=Count('id'), updated_at=Max('updated_at')
+    ))
+
+
+@per_format
+def questionnaire_list_etag(request):
+    version = _active_questionnaires_version(request)
+    return make_etag('questionnaires', version['count'], version['updated_at'], *_query_parts(request, ('cursor', 'limit')))
+
+
+def questionnaire_list_last_modified(request):
+    return _active_questionnaires_version(request)['updated_at']
+
+
+@per_format
+def questionnaire_detail_etag(request, pk):
+    """Version of one active questionnaire; editing its questions or options bumps ``updated_at``."""
+    updated_at = Questionnaire.objects.filter(pk=pk, is_active=True).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    return make_etag('questionnaire', pk, updated_at)
+
+
+@per_format
+def assessment_result_etag(request, assessment_id):
+    """
+    Version of one result: its stored score and risk level, plus its current
+    percentile (which moves as other assessments come in).
+    """
+    assessment = AssessmentResponse.objects.filter(pk=assessment_id).only(
+        'total_score', 'risk_level', 'questionnaire_id'
+    ).first()
+    if assessment is None:
+        return None
+    return make_etag('result', assessment_id, assessment.total_score, assessment.risk_level, score_percentile(assessment))
+
+
+def _user_stats_version(request):
+    """The user's history version, read from their statistics rollup (one row)."""
+    if not request.user.is_authenticated:
+        return None
+    return _per_request(request, 'user_stats', lambda: UserAssessmentStats.objects.filter(
+        user=request.user
+    ).values_list('assessment_count', 'updated_at').first() or (0, None))
+
+
+def _questionnaire_names_version(request):
+    """
+    When any questionnaire last changed: history pages embed questionnaire names.
+
+    Every questionnaire counts, active or not, since a history page can
+    name any of them; the table is small and ``updated_at`` is one aggregate.
+    """
+    return _per_request(request, 'questionnaire_names', lambda: Questionnaire.objects.aggregate(
+        updated_at=Max('updated_at')
+    )['updated_at'])
+
+
+@per_format
+def user_history_etag(request):
+    version = _user_stats_version(request)
+    if version is None:
+        return None
+    return make_etag(
+        'history', request.user.pk, *version, _questionnaire_names_version(request),
+        *_query_parts(request, ('cursor', 'limit')),
+    )
+
+
+@per_format
+def user_result_etag(request, pk):
+    """Version of one of the user's results, as ``assessment_result_etag`` plus the questionnaire names."""
+    if not request.user.is_authenticated:
+        return None
+    assessment = AssessmentResponse.objects.filter(pk=pk, user=request.user).only(
+        'total_score', 'risk_level', 'questionnaire_id'
+    ).first()
+    if assessment is None:
+        return None
+    return make_etag(
+        'user_result', pk, assessment.total_score, assessment.risk_level, score_percentile(assessment),
+        _questionnaire_names_version(request),
+    )
+
+
+@per_format
+def user_results_batch_etag(request):
+    version = _user_stats_version(request)
+    if version is None:
+        return None
+    return make_etag(
+        'batch', request.user.pk, *version, _questionnaire_names_version(request),
+        *_query_parts(request, ('ids', 'since', 'until', 'cursor', 'limit')),
+    )
+
+
+@per_format
+def user_history_series_etag(request):
+    version = _user_stats_version(request)
+    if version is None:
+        return None
+    return make_etag(
+        'series', request.user.pk, timezone.localdate(), *version,
+        *_query_parts(request, ('points', 'period', 'questionnaire')),
+    )
+
+
+def user_history_last_modified(request):
+    version = _user_stats_version(request)
+    if not version or version[1] is None:
+        return None
+    names_updated_at = _questionnaire_names_version(request)
+    return max(version[1], names_updated_at) if names_updated_at else version[1]
+
+
+@per_format
+def analytics_etag(request):
+    """Version of the analytics window: the day plus the total count it covers."""
+    if not request.user.is_staff:
+        return None
+    today = timezone.localdate()
+    total = DailyAssessmentRollup.objects.filter(
+        day__gt=today - timedelta(days=366)
+    ).aggregate(total=Sum('count'))['total']
+    return make_etag('analytics', today, total, *_query_parts(request, ('days', 'questionnaire')))
@@ -0,0 +1,97 @@
+"""
+Streaming CSV export of assessment data.
+
+Rows are produced by merge-joining two ordered streams: the assessments and
+their ``QuestionResponse`` answers, both read with ``.iterator()`` over a
+flat ``values_list`` projection. Memory use is bounded by the chunk size,
+not by the number of exported rows, and the header is emitted before any
+answer is read.
+"""
+import csv
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import AssessmentResponse, Question, QuestionResponse
+
+ASSESSMENT_COLUMNS = (
+    'id', 'user_id', 'session_id', 'questionnaire_id', 'completed_at', 'total_score', 'risk_level',
+)
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer that hands each line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_assessment_rows(queryset, chunk_size=2000):
+    """
+    Yield the header and one row per assessment with one column per question.
+
+    A question's column holds the answer's score (summed over the selected
+    options of a multiple choice question) and is empty when unanswered.
+
+    Args:
+        queryset: ``AssessmentResponse`` queryset to export
+        chunk_size (int): Rows fetched from the database at a time
+    """
+    question_ids = list(
+        Question.objects.filter(questionnaire__in=queryset.values('questionnaire_id'))
+        .order_by('questionnaire_id', 'order', 'id')
+        .values_list('id', flat=True)
+    )
+    column_index = {question_id: index for index, question_id in enumerate(question_ids)}
+
+    yield list(ASSESSMENT_COLUMNS) + [f'question_{question_id}' for question_id in question_ids]
+
+    assessments = (
+        queryset.order_by('id')
+        .values_list(*ASSESSMENT_COLUMNS)
+        .iterator(chunk_size=chunk_size)
+    )
+    answers = (
+        QuestionResponse.objects.filter(assessment__in=queryset.values('id'))
+        .order_by('assessment_id')
+        .values_list('assessment_id', 'question_id', 'score')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    answer = next(answers, None)
+    for row in assessments:
+        assessment_id = row[0]
+        scores = [''] * len(question_ids)
+
+        # Both streams are ordered by assessment id; skip answers of rows outside the export
+        while answer is not None and answer[0] < assessment_id:
+            answer = next(answers, None)
+        while answer is not None and answer[0] == assessment_id:
+            index = column_index.get(answer[1])
+            if index is not None:
+                scores[index] = answer[2] if scores[index] == '' else scores[index] + answer[2]
+            answer = next(answers, None)
+
+        completed_at = row[4]
+        yield list(row[:4]) + [completed_at.isoformat() if completed_at else '', *row[5:]] + scores
+
+
+def iter_assessment_csv(queryset, chunk_size=2000):
+    """Yield the export as CSV lines."""
+    writer = csv.writer(Echo())
+    for row in iter_assessment_rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+def assessment_csv_response(queryset, chunk_size=2000):
+    """Stream the export of ``queryset`` as a CSV attachment."""
+    filename = f"assessments-{timezone.now():%Y%m%d-%H%M%S}.csv"
+    response = StreamingHttpResponse(iter_assessment_csv(queryset, chunk_size), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_assessments_for_answers(answer_queryset, chunk_size=2000):
+    """Stream the export of the assessments that own the given answers."""
+    queryset = AssessmentResponse.objects.filter(id__in=answer_queryset.values('assessment_id'))
+    return assessment_csv_response(queryset, chunk_size)
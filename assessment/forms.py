@@ -1,70 +1,123 @@
+import threading
+
 from django import forms
 from django.forms import formset_factory
 from .models import Questionnaire, Question, QuestionResponse, AssessmentResponse
+from .scoring import SCALE_BOUNDS
+
+
+_form_classes = {}
+_form_classes_lock = threading.Lock()
+
+
+def build_question_fields(questionnaire):
+    """
+    Build the form fields for a questionnaire's required questions.
+    
+    Options are prefetched, so this costs two queries regardless of the
+    number of questions.
+    """
+    fields = {}
+    
+    for question in questionnaire.questions.filter(is_required=True).order_by('order').prefetch_related('options'):
+        field_name = f'question_{question.id}'
+        
+        if question.question_type == 'single_choice':
+            choices = [(option.id, option.text) for option in question.options.all()]
+            fields[field_name] = forms.ChoiceField(
+                choices=choices,
+                widget=forms.RadioSelect(attrs={'class': 'form-radio text-teal-600'}),
+                required=question.is_required,
+                label=question.text
+            )
+        
+        elif question.question_type == 'multiple_choice':
+            choices = [(option.id, option.text) for option in question.options.all()]
+            fields[field_name] = forms.MultipleChoiceField(
+                choices=choices,
+                widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-checkbox text-teal-600'}),
+                required=question.is_required,
+                label=question.text
+            )
+        
+        elif question.question_type == 'scale':
+            low, high = SCALE_BOUNDS['scale']
+            fields[field_name] = forms.IntegerField(
+                min_value=low,
+                max_value=high,
+                widget=forms.NumberInput(attrs={
+                    'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-teal-500',
+                }),
+                required=question.is_required,
+                label=question.text,
+                help_text="Rate from 1 (Not at all) to 5 (Very much)"
+            )
+        
+        elif question.question_type == 'scale_extended':
+            low, high = SCALE_BOUNDS['scale_extended']
+            fields[field_name] = forms.IntegerField(
+                min_value=low,
+                max_value=high,
+                widget=forms.NumberInput(attrs={
+                    'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-teal-500',
+                }),
+                required=question.is_required,
+                label=question.text,
+                help_text="Rate from 1 (Not at all) to 10 (Extremely)"
+            )
+        
+        elif question.question_type == 'text':
+            fields[field_name] = forms.CharField(
+                widget=forms.Textarea(attrs={
+                    'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-teal-500',
+                    'rows': 3
+                }),
+                required=question.is_required,
+                label=question.text
+            )
+    
+    return fields
 
 
 class AssessmentForm(forms.Form):
     """Dynamic form for assessment questions."""
     
+    # Set on classes returned by get_assessment_form_class()
+    compiled_version = None
+    
     def __init__(self, questionnaire, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.questionnaire = questionnaire
         
-        # Add fields for each question
-        for question in questionnaire.questions.filter(is_required=True).order_by('order'):
-            field_name = f'question_{question.id}'
-            
-            if question.question_type == 'single_choice':
-                choices = [(option.id, option.text) for option in question.options.all()]
-                self.fields[field_name] = forms.ChoiceField(
-                    choices=choices,
-                    widget=forms.RadioSelect(attrs={'class': 'form-radio text-teal-600'}),
-                    required=question.is_required,
-                    label=question.text
-                )
-            
-            elif question.question_type == 'multiple_choice':
-                choices = [(option.id, option.text) for option in question.options.all()]
-                self.fields[field_name] = forms.MultipleChoiceField(
-                    choices=choices,
-                    widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-checkbox text-teal-600'}),
-                    required=question.is_required,
-                    label=question.text
-                )
-            
-            elif question.question_type == 'scale':
-                self.fields[field_name] = forms.IntegerField(
-                    widget=forms.NumberInput(attrs={
-                        'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-teal-500',
-                        'min': '1',
-                        'max': '5'
-                    }),
-                    required=question.is_required,
-                    label=question.text,
-                    help_text="Rate from 1 (Not at all) to 5 (Very much)"
-                )
-            
-            elif question.question_type == 'scale_extended':
-                self.fields[field_name] = forms.IntegerField(
-                    widget=forms.NumberInput(attrs={
-                        'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-teal-500',
-                        'min': '1',
-                        'max': '10'
-                    }),
-                    required=question.is_required,
-                    label=question.text,
-                    help_text="Rate from 1 (Not at all) to 10 (Extremely)"
-                )
-            
-            elif question.question_type == 'text':
-                self.fields[field_name] = forms.CharField(
-                    widget=forms.Textarea(attrs={
-                        'class': 'w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-teal-500',
-                        'rows': 3
-                    }),
-                    required=question.is_required,
-                    label=question.text
-                )
+        # Add fields for each question unless they were compiled into the class
+        if self.compiled_version is None:
+            self.fields.update(build_question_fields(questionnaire))
+
+
+def get_assessment_form_class(questionnaire):
+    """
+    Return the form class for a questionnaire's current content version.
+    
+    The generated class is cached per process and keyed on
+    ``questionnaire.content_version``, so building or validating the form on
+    a cache hit does not query the questions or their options.
+    """
+    form_class = _form_classes.get(questionnaire.pk)
+    if form_class is not None and form_class.compiled_version == questionnaire.content_version:
+        return form_class
+    
+    attrs = build_question_fields(questionnaire)
+    attrs['compiled_version'] = questionnaire.content_version
+    form_class = type(f'AssessmentForm_{questionnaire.pk}', (AssessmentForm,), attrs)
+    with _form_classes_lock:
+        _form_classes[questionnaire.pk] = form_class
+    return form_class
+
+
+def invalidate_assessment_form_class(questionnaire_id):
+    """Drop the cached form class for a questionnaire in this process."""
+    with _form_classes_lock:
+        _form_classes.pop(questionnaire_id, None)
 
 
 class AssessmentStartForm(forms.Form):
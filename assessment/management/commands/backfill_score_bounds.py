@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.models import Questionnaire
+from assessment.scoring import compute_score_bounds
+from core.sync import record_change
+
+
+class Command(BaseCommand):
+    help = 'Backfill and verify the stored min/max possible scores of questionnaires'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only report questionnaires whose stored bounds are wrong; exit with an error if any are found',
+        )
+
+    def handle(self, *args, **options):
+        mismatched = 0
+
+        for questionnaire in Questionnaire.objects.order_by('pk'):
+            stored = (questionnaire.min_possible_score, questionnaire.max_possible_score)
+            expected = compute_score_bounds(questionnaire.pk, questionnaire.scoring_algorithm)
+            if stored == expected:
+                continue
+
+            mismatched += 1
+            self.stdout.write(f'{questionnaire.name}: stored {stored}, expected {expected}')
+
+            if not options['verify']:
+                # update() keeps updated_at, so cached plans and forms stay valid
+                Questionnaire.objects.filter(pk=questionnaire.pk).update(
+                    min_possible_score=expected[0],
+                    max_possible_score=expected[1],
+                )
+                record_change(Questionnaire, questionnaire.pk)
+
+        if options['verify'] and mismatched:
+            raise CommandError(f'{mismatched} questionnaire(s) have incorrect score bounds')
+
+        action = 'verified' if options['verify'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'Score bounds {action}: {mismatched} questionnaire(s) needed changes'
+        ))
@@ -0,0 +1,90 @@
+import time
+
+from django import forms
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from assessment.forms import AssessmentForm
+from assessment.models import Questionnaire
+from assessment.scoring import get_scoring_plan, invalidate_scoring_plan
+from core.middleware import get_admission_settings
+
+
+class _Rollback(Exception):
+    """Raised to discard everything written during the benchmark."""
+
+
+class Command(BaseCommand):
+    help = 'Measure queries and latency per take_assessment submission'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questionnaire', type=int, help='Questionnaire id (defaults to every active questionnaire)')
+        parser.add_argument('--iterations', type=int, default=20, help='Submissions per questionnaire')
+
+    def handle(self, *args, **options):
+        questionnaires = Questionnaire.objects.filter(is_active=True)
+        if options['questionnaire']:
+            questionnaires = questionnaires.filter(pk=options['questionnaire'])
+        questionnaires = list(questionnaires)
+        if not questionnaires:
+            raise CommandError('No active questionnaires to benchmark. Run populate_sample_data first.')
+
+        self.stdout.write(f"{'questionnaire':<40} {'questions':>9} {'score q (cold)':>14} "
+                          f"{'score q (warm)':>14} {'submit q':>9} {'ms/submit':>10}")
+
+        for questionnaire in questionnaires:
+            self.benchmark(questionnaire, options['iterations'])
+
+    def build_payload(self, questionnaire):
+        """Build a valid POST payload answering every field of the form."""
+        form = AssessmentForm(questionnaire)
+        payload = {}
+        for name, field in form.fields.items():
+            if isinstance(field, forms.MultipleChoiceField):
+                payload[name] = [str(field.choices[0][0])]
+            elif isinstance(field, forms.ChoiceField):
+                payload[name] = str(field.choices[0][0])
+            elif isinstance(field, forms.IntegerField):
+                payload[name] = '3'
+            else:
+                payload[name] = 'Benchmark response'
+        return payload
+
+    def benchmark(self, questionnaire, iterations):
+        payload = self.build_payload(questionnaire)
+        form = AssessmentForm(questionnaire, payload)
+        if not form.is_valid():
+            raise CommandError(f'Could not build a valid submission for "{questionnaire}": {form.errors.as_text()}')
+
+        invalidate_scoring_plan(questionnaire.pk)
+        with CaptureQueriesContext(connection) as cold:
+            get_scoring_plan(questionnaire).score(form.cleaned_data)
+        with CaptureQueriesContext(connection) as warm:
+            get_scoring_plan(questionnaire).score(form.cleaned_data)
+
+        client = Client(HTTP_HOST='localhost')
+        url = reverse('assessment:take_assessment', args=[questionnaire.pk])
+        submit_queries = []
+        # Admission control would shed the benchmark's burst of submissions
+        admission_settings = dict(get_admission_settings(), ENABLED=False)
+        started = time.perf_counter()
+        try:
+            with override_settings(ADMISSION_CONTROL=admission_settings), transaction.atomic():
+                for _ in range(iterations):
+                    with CaptureQueriesContext(connection) as submit:
+                        response = client.post(url, payload)
+                    if response.status_code != 302:
+                        raise CommandError(f'Submission failed with HTTP {response.status_code}')
+                    submit_queries.append(len(submit))
+                raise _Rollback
+        except _Rollback:
+            pass
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(
+            f"{questionnaire.name[:40]:<40} {len(get_scoring_plan(questionnaire)):>9} {len(cold):>14} "
+            f"{len(warm):>14} {max(submit_queries):>9} {elapsed_ms / iterations:>10.2f}"
+        )
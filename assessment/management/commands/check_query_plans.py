@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from assessment.query_plans import explain_settings, full_scans, hot_queries
+
+
+class Command(BaseCommand):
+    help = 'Explain the hot assessment, appointment and bookmark queries and fail if any needs a full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--show-plans', action='store_true', help='Print every query plan')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Query plan checks are not implemented for {connection.vendor}')
+
+        regressions = []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for statement in explain_settings():
+                    cursor.execute(statement)
+
+            for name, table, _, queryset in hot_queries():
+                plan = queryset.explain()
+                scans = full_scans(plan, table)
+
+                if options['show_plans'] or scans:
+                    self.stdout.write(f'{name}:')
+                    for line in plan.splitlines():
+                        self.stdout.write(f'    {line}')
+
+                if scans:
+                    regressions.append(name)
+                    self.stdout.write(self.style.ERROR(f'{name}: full table scan of {table}'))
+                else:
+                    self.stdout.write(f'{name}: ok')
+
+        if regressions:
+            raise CommandError(f'Hot queries regressed to a full table scan: {", ".join(regressions)}')
+
+        self.stdout.write(self.style.SUCCESS('All hot queries use an index'))
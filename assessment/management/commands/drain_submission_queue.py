@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from assessment.queue import drain_queue, get_queue_settings
+
+
+class Command(BaseCommand):
+    help = 'Persist queued assessment submissions in batched transactions (single writer)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--interval', type=float, default=0.2, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--batch-size', type=int, help='Submissions per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or get_queue_settings()['BATCH_SIZE']
+
+        while True:
+            started = time.perf_counter()
+            processed = drain_queue(batch_size=batch_size)
+
+            if processed is None:
+                self.stderr.write('Another queue writer is running')
+                if options['once']:
+                    return
+            elif processed:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'Persisted {processed} submission(s) in {elapsed * 1000:.1f} ms')
+
+            if options['once']:
+                return
+            if not processed:
+                time.sleep(options['interval'])
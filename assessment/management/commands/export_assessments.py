@@ -0,0 +1,36 @@
+from datetime import datetime
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from assessment.export import iter_assessment_csv
+from assessment.models import AssessmentResponse
+
+
+class Command(BaseCommand):
+    help = 'Stream assessments joined with their answers as CSV (one column per question)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help='File to write (defaults to stdout)')
+        parser.add_argument('--questionnaire', type=int, help='Only export this questionnaire')
+        parser.add_argument('--since', help='Only export assessments completed on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched from the database at a time')
+
+    def handle(self, *args, **options):
+        queryset = AssessmentResponse.objects.all()
+        if options['questionnaire']:
+            queryset = queryset.filter(questionnaire_id=options['questionnaire'])
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d')
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+            queryset = queryset.filter(completed_at__gte=timezone.make_aware(since))
+
+        lines = iter_assessment_csv(queryset, options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
@@ -0,0 +1,157 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import Q
+from django.test import Client, override_settings
+from django.urls import resolve, reverse
+
+from assessment.models import AssessmentResponse, Questionnaire
+from assessment.queue import drain_queue, get_queue_settings
+from assessment.submissions import RollupScope, rebuild_rollups
+from core.middleware import get_admission_settings
+
+from .benchmark_submissions import Command as BenchmarkCommand
+
+
+CLEANUP_BATCH_SIZE = 500
+
+
+def _submit(url, payload, count, use_queue):
+    """
+    Post ``count`` submissions from a worker process and time each one.
+
+    Returns:
+        tuple: ``(latencies, locked, errors, created)`` where ``created`` lists
+        the ``('id', assessment_id)`` or ``('submission_key', key)`` each
+        accepted submission redirected to
+    """
+    queue_settings = dict(get_queue_settings(), ENABLED=use_queue)
+    latencies = []
+    created = []
+    locked = errors = 0
+
+    # The load test measures the write path, so admission control must not shed it
+    admission_settings = dict(get_admission_settings(), ENABLED=False)
+
+    with override_settings(ASSESSMENT_WRITE_QUEUE=queue_settings, ADMISSION_CONTROL=admission_settings):
+        client = Client(HTTP_HOST='localhost')
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                response = client.post(url, payload)
+                if response.status_code != 302:
+                    errors += 1
+                else:
+                    # The result page (direct) or pending page (queue) identifies the stored row
+                    kwargs = resolve(response.url).kwargs
+                    if 'assessment_id' in kwargs:
+                        created.append(('id', int(kwargs['assessment_id'])))
+                    elif 'submission_key' in kwargs:
+                        created.append(('submission_key', kwargs['submission_key']))
+            except OperationalError as exc:
+                if 'locked' in str(exc):
+                    locked += 1
+                else:
+                    errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    connections.close_all()
+    return latencies, locked, errors, created
+
+
+def _drain_until(stop_event):
+    """Run the single queue writer until the load generators are done."""
+    while not stop_event.is_set():
+        if not drain_queue():
+            time.sleep(0.05)
+    drain_queue()
+    connections.close_all()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = 'Hammer take_assessment from several processes, with and without the write queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questionnaire', type=int, help='Questionnaire id (defaults to the first active one)')
+        parser.add_argument('--processes', type=int, default=8, help='Concurrent client processes')
+        parser.add_argument('--requests', type=int, default=50, help='Submissions per process')
+        parser.add_argument('--mode', choices=['direct', 'queue', 'both'], default='both')
+        parser.add_argument('--keep', action='store_true', help='Keep the assessments written by the load test')
+
+    def handle(self, *args, **options):
+        questionnaires = Questionnaire.objects.filter(is_active=True)
+        if options['questionnaire']:
+            questionnaires = questionnaires.filter(pk=options['questionnaire'])
+        questionnaire = questionnaires.first()
+        if questionnaire is None:
+            raise CommandError('No active questionnaire to submit. Run populate_sample_data first.')
+
+        url = reverse('assessment:take_assessment', args=[questionnaire.pk])
+        payload = BenchmarkCommand().build_payload(questionnaire)
+        self.created = []
+
+        modes = ['direct', 'queue'] if options['mode'] == 'both' else [options['mode']]
+        self.stdout.write(f"{'mode':<8} {'requests':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} "
+                          f"{'locked':>7} {'errors':>7} {'req/s':>8} {'persisted':>10}")
+
+        try:
+            for mode in modes:
+                self.run(mode, url, payload, options['processes'], options['requests'])
+        finally:
+            if not options['keep']:
+                self.clean_up()
+
+    def clean_up(self):
+        """Delete the assessments this run created and take them out of the rollups."""
+        rollups = RollupScope()
+        deleted = 0
+        with transaction.atomic():
+            for start in range(0, len(self.created), CLEANUP_BATCH_SIZE):
+                batch = self.created[start:start + CLEANUP_BATCH_SIZE]
+                assessments = AssessmentResponse.objects.filter(
+                    Q(id__in=[value for field, value in batch if field == 'id'])
+                    | Q(submission_key__in=[value for field, value in batch if field == 'submission_key'])
+                )
+                rollups.add(assessments)
+                deleted += assessments.delete()[1].get(AssessmentResponse._meta.label, 0)
+            rebuild_rollups(rollups)
+        self.stdout.write(f'Deleted the {deleted} assessment(s) written by the load test')
+
+    def run(self, mode, url, payload, processes, requests):
+        use_queue = mode == 'queue'
+        context = multiprocessing.get_context('fork')
+        before = AssessmentResponse.objects.count()
+        connections.close_all()
+
+        stop_event = context.Event()
+        drainer = None
+        if use_queue:
+            drainer = context.Process(target=_drain_until, args=(stop_event,))
+            drainer.start()
+
+        started = time.perf_counter()
+        with context.Pool(processes) as pool:
+            results = pool.starmap(_submit, [(url, payload, requests, use_queue)] * processes)
+        elapsed = time.perf_counter() - started
+
+        if drainer is not None:
+            stop_event.set()
+            drainer.join()
+
+        latencies = [latency for result in results for latency in result[0]]
+        locked = sum(result[1] for result in results)
+        errors = sum(result[2] for result in results)
+        self.created.extend(item for result in results for item in result[3])
+        persisted = AssessmentResponse.objects.count() - before
+
+        self.stdout.write(
+            f'{mode:<8} {len(latencies):>8} {_percentile(latencies, 0.5):>9.2f} {_percentile(latencies, 0.99):>9.2f} '
+            f'{max(latencies):>9.2f} {locked:>7} {errors:>7} {len(latencies) / elapsed:>8.1f} {persisted:>10}'
+        )
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from assessment.analytics import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily assessment analytics rollups from the assessment history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only rebuild days on or after this date (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+
+        with transaction.atomic():
+            written = rebuild_daily_rollups(since)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} daily rollup row(s)'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from assessment.percentiles import rebuild_score_histograms
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-questionnaire score histograms used for percentile ranks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--questionnaire', type=int, action='append', dest='questionnaires',
+            help='Only rebuild this questionnaire id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_score_histograms(options['questionnaires'])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} score histogram bucket(s)'))
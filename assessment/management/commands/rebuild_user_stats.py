@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from assessment.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user assessment statistics rollups from the assessment history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Only rebuild this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_user_stats(options['users'])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {written} user(s)'))
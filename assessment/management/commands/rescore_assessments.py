@@ -0,0 +1,140 @@
+import json
+from pathlib import Path
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from assessment.analytics import rebuild_daily_rollups
+from assessment.models import AssessmentResponse, Questionnaire
+from assessment.percentiles import rebuild_score_histograms
+from assessment.scoring import compile_scoring_plan
+from assessment.stats import rebuild_user_stats
+from assessment.submissions import RollupScope, rebuild_rollups
+
+QUICK_KEY = 'quick'
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored assessment totals and risk levels with the current scoring rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questionnaire', type=int, help='Only rescore this questionnaire')
+        parser.add_argument('--skip-quick', action='store_true', help='Do not rescore quick assessments')
+        parser.add_argument('--chunk-size', type=int, default=50000, help='Assessments per chunk')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk_update statement')
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without writing them')
+        parser.add_argument('--show-diff', type=int, default=20, help='Changed assessments to print per questionnaire')
+        parser.add_argument(
+            '--checkpoint',
+            default=str(Path(settings.BASE_DIR) / 'var' / 'rescore_checkpoint.json'),
+            help='File recording the last rescored assessment per questionnaire',
+        )
+        parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint file')
+
+    def handle(self, *args, **options):
+        try:
+            from assessment import rescoring
+        except ImportError:
+            raise CommandError('rescore_assessments requires NumPy (pip install numpy)')
+        self.rescoring = rescoring
+
+        self.options = options
+        self.checkpoint_path = Path(options['checkpoint'])
+        self.checkpoint = self.load_checkpoint() if options['resume'] else {}
+        self.rollups = RollupScope()
+
+        questionnaires = Questionnaire.objects.order_by('pk')
+        if options['questionnaire']:
+            questionnaires = questionnaires.filter(pk=options['questionnaire'])
+
+        jobs = [(str(q.pk), q.name, q.pk, rescoring.ChunkRescorer(compile_scoring_plan(q))) for q in questionnaires]
+        if not options['skip_quick'] and not options['questionnaire']:
+            jobs.append((QUICK_KEY, 'Quick Assessment', None, rescoring.QuickRescorer()))
+
+        started = time.perf_counter()
+        total_seen = total_changed = 0
+        for key, name, questionnaire_id, rescorer in jobs:
+            seen, changed = self.rescore(key, name, questionnaire_id, rescorer)
+            total_seen += seen
+            total_changed += changed
+
+        if not options['dry_run']:
+            self.rebuild_rollups()
+
+        elapsed = time.perf_counter() - started
+        verb = 'would change' if options['dry_run'] else 'changed'
+        self.stdout.write(self.style.SUCCESS(
+            f'Rescored {total_seen} assessment(s) in {elapsed:.1f}s; {verb} {total_changed}'
+        ))
+        if not options['dry_run'] and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+
+    def rescore(self, key, name, questionnaire_id, rescorer):
+        np = self.rescoring.np
+        after_id = self.checkpoint.get(key, 0)
+        seen = changed = shown = 0
+
+        for ids, stored_scores, stored_risks in self.rescoring.iter_chunks(
+            questionnaire_id, after_id, self.options['chunk_size']
+        ):
+            totals, risks = rescorer.rescore(ids, stored_scores)
+            mask = (totals != stored_scores) | (risks != stored_risks)
+            changed_rows = np.flatnonzero(mask)
+            seen += len(ids)
+            changed += len(changed_rows)
+
+            for row in changed_rows[:max(0, self.options['show_diff'] - shown)]:
+                self.stdout.write(
+                    f'  {name} #{ids[row]}: score {stored_scores[row]} -> {totals[row]}, '
+                    f'risk {stored_risks[row]} -> {risks[row]}'
+                )
+                shown += 1
+
+            if not self.options['dry_run']:
+                updates = [
+                    AssessmentResponse(id=int(ids[row]), total_score=int(totals[row]), risk_level=str(risks[row]))
+                    for row in changed_rows
+                ]
+                with transaction.atomic():
+                    AssessmentResponse.objects.bulk_update(
+                        updates, ['total_score', 'risk_level'], batch_size=self.options['batch_size']
+                    )
+                batch_size = self.options['batch_size']
+                for start in range(0, len(updates), batch_size):
+                    changed_ids = [update.id for update in updates[start:start + batch_size]]
+                    self.rollups.add(AssessmentResponse.objects.filter(id__in=changed_ids))
+                self.checkpoint[key] = int(ids[-1])
+                self.save_checkpoint()
+
+        self.stdout.write(f'{name}: {seen} assessment(s), {changed} changed')
+        return seen, changed
+
+    def rebuild_rollups(self):
+        """Recompute the statistics, daily rollups and histograms that count rescored assessments."""
+        if self.options['resume']:
+            # The interrupted run's changes are not known: rebuild everything
+            rebuild_user_stats()
+            rebuild_daily_rollups()
+            rebuild_score_histograms()
+            self.stdout.write('Rebuilt all user statistics, daily rollups and score histograms')
+        elif self.rollups:
+            rebuild_rollups(self.rollups)
+            self.stdout.write(
+                f'Rebuilt rollups of {len(self.rollups.user_ids)} user(s), {len(self.rollups.days)} day(s) '
+                f'and {len(self.rollups.questionnaire_ids)} questionnaire(s)'
+            )
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return {}
+        with open(self.checkpoint_path) as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def save_checkpoint(self):
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump(self.checkpoint, checkpoint_file)
+        temp_path.replace(self.checkpoint_path)
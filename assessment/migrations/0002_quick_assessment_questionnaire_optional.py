@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assessmentresponse',
+            name='questionnaire',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='assessment.questionnaire'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:11
+
+from django.db import migrations, models
+
+from assessment.scoring import item_bounds
+
+
+def backfill_score_bounds(apps, schema_editor):
+    """
+    Store the bounds of existing questionnaires, so none is rated against max 0.
+
+    Every questionnaire is summed at this point (weights and scoring
+    algorithms come later, with sum as the default), so the bounds are the
+    sums of the required questions' item bounds.
+    """
+    Questionnaire = apps.get_model('assessment', 'Questionnaire')
+    Question = apps.get_model('assessment', 'Question')
+    QuestionOption = apps.get_model('assessment', 'QuestionOption')
+
+    values_by_question = {}
+    for question_id, value in QuestionOption.objects.filter(question__is_required=True).values_list('question_id', 'value'):
+        values_by_question.setdefault(question_id, []).append(value)
+
+    bounds = {}
+    questions = Question.objects.filter(is_required=True).values_list('id', 'questionnaire_id', 'question_type')
+    for question_id, questionnaire_id, question_type in questions:
+        low, high = item_bounds(question_type, values_by_question.get(question_id))
+        min_score, max_score = bounds.get(questionnaire_id, (0, 0))
+        bounds[questionnaire_id] = (min_score + low, max_score + high)
+
+    for questionnaire_id, (min_score, max_score) in bounds.items():
+        Questionnaire.objects.filter(pk=questionnaire_id).update(
+            min_possible_score=min_score, max_possible_score=max_score,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0002_quick_assessment_questionnaire_optional'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionnaire',
+            name='max_possible_score',
+            field=models.IntegerField(default=0, editable=False, help_text='Maintained automatically from the questions'),
+        ),
+        migrations.AddField(
+            model_name='questionnaire',
+            name='min_possible_score',
+            field=models.IntegerField(default=0, editable=False, help_text='Maintained automatically from the questions'),
+        ),
+        migrations.RunPython(backfill_score_bounds, migrations.RunPython.noop),
+    ]
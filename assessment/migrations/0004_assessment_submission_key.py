@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0003_questionnaire_score_bounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentresponse',
+            name='submission_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='assessmentresponse',
+            name='completed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0004_assessment_submission_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentresponse',
+            name='subscale_scores',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='dimension',
+            field=models.CharField(blank=True, choices=[('mood', 'Mood'), ('sleep', 'Sleep'), ('stress', 'Stress'), ('social', 'Social'), ('energy', 'Energy')], help_text='Subscale this question contributes to', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='reverse_scored',
+            field=models.BooleanField(default=False, help_text='Used by the weighted scoring algorithm'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='weight',
+            field=models.FloatField(default=1.0, help_text='Used by the weighted scoring algorithm'),
+        ),
+        migrations.AddField(
+            model_name='questionnaire',
+            name='scoring_algorithm',
+            field=models.CharField(choices=[('sum', 'Sum of answer values'), ('weighted', 'Weighted, with reverse-keyed items')], default='sum', max_length=20),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('assessment', '0005_scoring_engines'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAssessmentStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='assessment_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('assessment_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('min_score', models.IntegerField(blank=True, null=True)),
+                ('max_score', models.IntegerField(blank=True, null=True)),
+                ('last_score', models.IntegerField(blank=True, null=True)),
+                ('last_risk_level', models.CharField(blank=True, choices=[('low', 'Low Risk'), ('moderate', 'Moderate Risk'), ('high', 'High Risk')], max_length=20)),
+                ('last_completed_at', models.DateTimeField(blank=True, null=True)),
+                ('low_count', models.PositiveIntegerField(default=0)),
+                ('moderate_count', models.PositiveIntegerField(default=0)),
+                ('high_count', models.PositiveIntegerField(default=0)),
+                ('daily_window', models.JSONField(blank=True, default=dict, help_text='Date -> [count, score sum] for the last 30 days')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'User assessment stats',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0006_user_assessment_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAssessmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('risk_level', models.CharField(choices=[('low', 'Low Risk'), ('moderate', 'Moderate Risk'), ('high', 'High Risk')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('score_sq_sum', models.BigIntegerField(default=0)),
+                ('questionnaire', models.ForeignKey(blank=True, help_text='Empty for quick assessments', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='assessment.questionnaire')),
+            ],
+            options={
+                'ordering': ['-day', 'questionnaire', 'risk_level'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyassessmentrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('questionnaire__isnull', False)), fields=('day', 'questionnaire', 'risk_level'), name='unique_daily_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyassessmentrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('questionnaire__isnull', True)), fields=('day', 'risk_level'), name='unique_daily_quick_rollup'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0007_daily_assessment_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreHistogramBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('questionnaire', models.ForeignKey(blank=True, help_text='Empty for quick assessments', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='assessment.questionnaire')),
+            ],
+            options={
+                'ordering': ['questionnaire', 'score'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scorehistogrambucket',
+            constraint=models.UniqueConstraint(condition=models.Q(('questionnaire__isnull', False)), fields=('questionnaire', 'score'), name='unique_score_bucket'),
+        ),
+        migrations.AddConstraint(
+            model_name='scorehistogrambucket',
+            constraint=models.UniqueConstraint(condition=models.Q(('questionnaire__isnull', True)), fields=('score',), name='unique_quick_score_bucket'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0008_score_histogram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessmentresponse',
+            index=models.Index(fields=['user', '-completed_at'], name='assessment_user_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessmentresponse',
+            index=models.Index(fields=['risk_level', 'completed_at'], name='assessment_risk_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessmentresponse',
+            index=models.Index(fields=['questionnaire', 'completed_at'], name='assessment_q_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessmentresponse',
+            index=models.Index(fields=['session_id'], name='assessment_session_idx'),
+        ),
+    ]
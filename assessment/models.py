@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from datetime import timedelta
 
 User = get_user_model()
 
@@ -8,15 +10,29 @@ User = get_user_model()
 class Questionnaire(models.Model):
     """Model for storing questionnaire templates."""
     
+    # Must match the engines registered in assessment.scoring
+    SCORING_ALGORITHMS = [
+        ('sum', 'Sum of answer values'),
+        ('weighted', 'Weighted, with reverse-keyed items'),
+    ]
+    
     name = models.CharField(max_length=200)
     description = models.TextField()
+    scoring_algorithm = models.CharField(max_length=20, choices=SCORING_ALGORITHMS, default='sum')
     is_active = models.BooleanField(default=True)
+    min_possible_score = models.IntegerField(default=0, editable=False, help_text="Maintained automatically from the questions")
+    max_possible_score = models.IntegerField(default=0, editable=False, help_text="Maintained automatically from the questions")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
     
+    @property
+    def content_version(self):
+        """Version stamp of the questionnaire's content, bumped whenever a question or option changes."""
+        return int(self.updated_at.timestamp() * 1000000) if self.updated_at else 0
+    
     class Meta:
         ordering = ['-created_at']
 
@@ -32,9 +48,20 @@ class Question(models.Model):
         ('text', 'Text Response'),
     ]
     
+    DIMENSIONS = [
+        ('mood', 'Mood'),
+        ('sleep', 'Sleep'),
+        ('stress', 'Stress'),
+        ('social', 'Social'),
+        ('energy', 'Energy'),
+    ]
+    
     questionnaire = models.ForeignKey(Questionnaire, on_delete=models.CASCADE, related_name='questions')
     text = models.TextField()
     question_type = models.CharField(max_length=20, choices=QUESTION_TYPES)
+    dimension = models.CharField(max_length=20, choices=DIMENSIONS, blank=True, help_text="Subscale this question contributes to")
+    weight = models.FloatField(default=1.0, help_text="Used by the weighted scoring algorithm")
+    reverse_scored = models.BooleanField(default=False, help_text="Used by the weighted scoring algorithm")
     order = models.PositiveIntegerField(default=0)
     is_required = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -71,19 +98,31 @@ class AssessmentResponse(models.Model):
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='assessments', null=True, blank=True)
-    questionnaire = models.ForeignKey(Questionnaire, on_delete=models.CASCADE)
+    questionnaire = models.ForeignKey(Questionnaire, on_delete=models.CASCADE, null=True, blank=True)  # Null for quick assessments
     session_id = models.CharField(max_length=100, null=True, blank=True)  # For anonymous users
+    submission_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
     total_score = models.IntegerField(default=0)
+    subscale_scores = models.JSONField(default=dict, blank=True)  # Dimension -> score
     risk_level = models.CharField(max_length=20, choices=RISK_LEVELS)
-    completed_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(default=timezone.now)  # Set at submit time, also for queued writes
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     
     def __str__(self):
         user_info = self.user.username if self.user else f"Anonymous ({self.session_id})"
-        return f"{user_info} - {self.questionnaire.name} - {self.risk_level}"
+        questionnaire_name = self.questionnaire.name if self.questionnaire else 'Quick Assessment'
+        return f"{user_info} - {questionnaire_name} - {self.risk_level}"
     
     class Meta:
         ordering = ['-completed_at']
+        indexes = [
+            # Dashboards, history and the chart series
+            models.Index(fields=['user', '-completed_at'], name='assessment_user_completed_idx'),
+            # Admin filters and analytics rebuilds
+            models.Index(fields=['risk_level', 'completed_at'], name='assessment_risk_completed_idx'),
+            models.Index(fields=['questionnaire', 'completed_at'], name='assessment_q_completed_idx'),
+            # Anonymous (session based) lookups
+            models.Index(fields=['session_id'], name='assessment_session_idx'),
+        ]
 
 
 class QuestionResponse(models.Model):
@@ -140,7 +179,154 @@ class UserProgress(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"{self.user.username} - {self.assessment.questionnaire.name} - {self.created_at.date()}"
+        questionnaire_name = self.assessment.questionnaire.name if self.assessment.questionnaire else 'Quick Assessment'
+        return f"{self.user.username} - {questionnaire_name} - {self.created_at.date()}"
     
     class Meta:
         ordering = ['-created_at']
+
+
+class UserAssessmentStats(models.Model):
+    """Per-user rollup of assessment history, updated with every new assessment."""
+    
+    WINDOW_DAYS = 30
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='assessment_stats')
+    assessment_count = models.PositiveIntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    min_score = models.IntegerField(null=True, blank=True)
+    max_score = models.IntegerField(null=True, blank=True)
+    last_score = models.IntegerField(null=True, blank=True)
+    last_risk_level = models.CharField(max_length=20, choices=AssessmentResponse.RISK_LEVELS, blank=True)
+    last_completed_at = models.DateTimeField(null=True, blank=True)
+    low_count = models.PositiveIntegerField(default=0)
+    moderate_count = models.PositiveIntegerField(default=0)
+    high_count = models.PositiveIntegerField(default=0)
+    daily_window = models.JSONField(default=dict, blank=True, help_text="Date -> [count, score sum] for the last 30 days")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.assessment_count} assessments"
+    
+    def record(self, total_score, risk_level, completed_at, now=None):
+        """Add one assessment to the rollup (the caller saves)."""
+        self.assessment_count += 1
+        self.score_sum += total_score
+        self.min_score = total_score if self.min_score is None else min(self.min_score, total_score)
+        self.max_score = total_score if self.max_score is None else max(self.max_score, total_score)
+        
+        if self.last_completed_at is None or completed_at >= self.last_completed_at:
+            self.last_score = total_score
+            self.last_risk_level = risk_level
+            self.last_completed_at = completed_at
+        
+        count_field = f'{risk_level}_count'
+        if hasattr(self, count_field):
+            setattr(self, count_field, getattr(self, count_field) + 1)
+        
+        day = timezone.localdate(completed_at).isoformat()
+        self.prune_window(now)
+        if day >= self.window_start(now):
+            count, score_sum = self.daily_window.get(day, (0, 0))
+            self.daily_window[day] = [count + 1, score_sum + total_score]
+    
+    def window_start(self, now=None):
+        """First day (ISO format) of the rolling window."""
+        today = timezone.localdate(now or timezone.now())
+        return (today - timedelta(days=self.WINDOW_DAYS - 1)).isoformat()
+    
+    def prune_window(self, now=None):
+        start = self.window_start(now)
+        self.daily_window = {day: bucket for day, bucket in self.daily_window.items() if day >= start}
+    
+    @property
+    def average_score(self):
+        return self.score_sum / self.assessment_count if self.assessment_count else 0
+    
+    @property
+    def risk_distribution(self):
+        """Risk level counts in the shape of a ``values('risk_level').annotate(count=...)`` query."""
+        return [
+            {'risk_level': risk_level, 'count': getattr(self, f'{risk_level}_count')}
+            for risk_level, _ in AssessmentResponse.RISK_LEVELS
+            if getattr(self, f'{risk_level}_count')
+        ]
+    
+    def recent_window(self, now=None):
+        """
+        Summary of the rolling window.
+        
+        Returns:
+            dict: ``count`` and ``average_score`` of assessments in the last 30 days
+        """
+        start = self.window_start(now)
+        buckets = [bucket for day, bucket in self.daily_window.items() if day >= start]
+        count = sum(bucket[0] for bucket in buckets)
+        score_sum = sum(bucket[1] for bucket in buckets)
+        return {'count': count, 'average_score': score_sum / count if count else 0}
+    
+    class Meta:
+        verbose_name_plural = 'User assessment stats'
+
+
+class DailyAssessmentRollup(models.Model):
+    """Assessment counts and score moments per day, questionnaire and risk level."""
+    
+    day = models.DateField()
+    questionnaire = models.ForeignKey(
+        Questionnaire, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_rollups',
+        help_text="Empty for quick assessments"
+    )
+    risk_level = models.CharField(max_length=20, choices=AssessmentResponse.RISK_LEVELS)
+    count = models.PositiveIntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    score_sq_sum = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        name = self.questionnaire.name if self.questionnaire else "Quick Assessment"
+        return f"{self.day} - {name} - {self.risk_level}: {self.count}"
+    
+    class Meta:
+        ordering = ['-day', 'questionnaire', 'risk_level']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'questionnaire', 'risk_level'],
+                condition=models.Q(questionnaire__isnull=False),
+                name='unique_daily_rollup',
+            ),
+            models.UniqueConstraint(
+                fields=['day', 'risk_level'],
+                condition=models.Q(questionnaire__isnull=True),
+                name='unique_daily_quick_rollup',
+            ),
+        ]
+
+
+class ScoreHistogramBucket(models.Model):
+    """Number of assessments with a given total score, per questionnaire."""
+    
+    questionnaire = models.ForeignKey(
+        Questionnaire, on_delete=models.CASCADE, null=True, blank=True, related_name='score_buckets',
+        help_text="Empty for quick assessments"
+    )
+    score = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        name = self.questionnaire.name if self.questionnaire else "Quick Assessment"
+        return f"{name} - score {self.score}: {self.count}"
+    
+    class Meta:
+        ordering = ['questionnaire', 'score']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['questionnaire', 'score'],
+                condition=models.Q(questionnaire__isnull=False),
+                name='unique_score_bucket',
+            ),
+            models.UniqueConstraint(
+                fields=['score'],
+                condition=models.Q(questionnaire__isnull=True),
+                name='unique_quick_score_bucket',
+            ),
+        ]
@@ -0,0 +1,147 @@
+"""
+Score percentiles from per-questionnaire score histograms.
+
+Total scores are integers within the questionnaire's stored min/max bounds
+(a few dozen distinct values), so the distribution is kept exactly as a
+histogram of counts per score instead of an approximate t-digest/KLL sketch.
+Histograms merge by adding counts, which is how concurrent writers combine
+theirs: each submission increments its score's ``ScoreHistogramBucket`` row.
+A percentile then reads one small row per distinct score and never scans
+``AssessmentResponse``.
+"""
+from bisect import bisect_left
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import AssessmentResponse, ScoreHistogramBucket
+
+
+class ScoreHistogram:
+    """Exact, mergeable distribution of integer scores."""
+
+    __slots__ = ('counts',)
+
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+
+    @classmethod
+    def load(cls, questionnaire_id):
+        """Load a questionnaire's histogram (``None`` for quick assessments)."""
+        buckets = ScoreHistogramBucket.objects.filter(questionnaire_id=questionnaire_id)
+        return cls(buckets.values_list('score', 'count'))
+
+    def add(self, score, count=1):
+        self.counts[score] = self.counts.get(score, 0) + count
+
+    def merge(self, other):
+        """Add another histogram's counts into this one."""
+        for score, count in other.counts.items():
+            self.add(score, count)
+        return self
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def percentile(self, score):
+        """
+        Percentile rank of ``score`` (0-100).
+
+        Ties count half, so the middle of a group of equal scores ranks at
+        the group's midpoint rather than at its top.
+
+        Returns:
+            float: The rank, or None for an empty histogram
+        """
+        total = self.total
+        if not total:
+            return None
+        below = sum(count for value, count in self.counts.items() if value < score)
+        return 100 * (below + self.counts.get(score, 0) / 2) / total
+
+    def quantile(self, fraction):
+        """Smallest score with at least ``fraction`` of the assessments at or below it."""
+        scores = sorted(self.counts)
+        if not scores:
+            return None
+        cumulative = []
+        running = 0
+        for score in scores:
+            running += self.counts[score]
+            cumulative.append(running)
+        index = bisect_left(cumulative, fraction * running)
+        return scores[min(index, len(scores) - 1)]
+
+
+def _buckets(questionnaire_id, score):
+    # questionnaire_id=None filters with IS NULL
+    return ScoreHistogramBucket.objects.filter(questionnaire_id=questionnaire_id, score=score)
+
+
+def record_score_histograms(submissions):
+    """
+    Add new submissions to their questionnaires' histograms.
+
+    Must run inside the transaction that stores the submissions.
+    """
+    histograms = {}
+    for submission in submissions:
+        histograms.setdefault(submission.questionnaire_id, ScoreHistogram()).add(submission.total_score)
+
+    for questionnaire_id, histogram in histograms.items():
+        for score, count in histogram.counts.items():
+            if _buckets(questionnaire_id, score).update(count=F('count') + count):
+                continue
+            try:
+                with transaction.atomic():
+                    ScoreHistogramBucket.objects.create(questionnaire_id=questionnaire_id, score=score, count=count)
+            except IntegrityError:
+                # Another writer created the bucket first
+                _buckets(questionnaire_id, score).update(count=F('count') + count)
+
+
+def rebuild_score_histograms(questionnaire_ids=None):
+    """
+    Recompute the histograms from the assessment history.
+
+    Args:
+        questionnaire_ids (list): Only rebuild these questionnaires, None standing for
+            quick assessments (defaults to all, quick included)
+
+    Returns:
+        int: Number of buckets written
+    """
+    assessments = AssessmentResponse.objects.all()
+    buckets = ScoreHistogramBucket.objects.all()
+    if questionnaire_ids is not None:
+        questionnaire_ids = set(questionnaire_ids)
+        selected = Q(questionnaire_id__in=questionnaire_ids - {None})
+        if None in questionnaire_ids:
+            selected |= Q(questionnaire__isnull=True)
+        assessments = assessments.filter(selected)
+        buckets = buckets.filter(selected)
+    buckets.delete()
+
+    rows = (
+        assessments.values('questionnaire_id', 'total_score')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    batch = [
+        ScoreHistogramBucket(questionnaire_id=row['questionnaire_id'], score=row['total_score'], count=row['count'])
+        for row in rows
+    ]
+    ScoreHistogramBucket.objects.bulk_create(batch, batch_size=1000)
+    return len(batch)
+
+
+def score_percentile(assessment):
+    """
+    Percentile rank of an assessment's score among its questionnaire's assessments.
+
+    Returns:
+        int: The rounded rank, or None when there is nothing to compare against
+    """
+    percentile = ScoreHistogram.load(assessment.questionnaire_id).percentile(assessment.total_score)
+    return None if percentile is None else round(percentile)
@@ -0,0 +1,77 @@
+"""
+The hot view queries and how to spot a full table scan in their plans.
+
+Used by the ``check_query_plans`` command (against a live database) and the
+query plan regression tests.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from resources.models import UserBookmark
+from therapists.models import Appointment
+
+from .models import AssessmentResponse
+from .pagination import keyset_filter
+from .views import HISTORY_ORDERING
+
+
+def explain_settings():
+    """
+    Statements to run (in a transaction) before explaining the hot queries.
+
+    Small tables make sequential scans look cheap on PostgreSQL; only fall
+    back to one when no index applies.
+    """
+    if connection.vendor == 'postgresql':
+        return ['SET LOCAL enable_seqscan = off']
+    return []
+
+
+def hot_queries():
+    """
+    The hot view queries, as ``(name, table, index, queryset)``.
+
+    ``index`` is the index the query is expected to use (None when it is one
+    Django names itself, such as a unique constraint's). Parameter values do
+    not matter for the plan, so fixed ones are used.
+    """
+    now = timezone.now()
+    month_ago = now - timedelta(days=30)
+    return [
+        ('dashboard recent assessments', AssessmentResponse._meta.db_table, 'assessment_user_completed_idx',
+         AssessmentResponse.objects.filter(user_id=1).order_by('-completed_at')[:5]),
+        ('assessment history', AssessmentResponse._meta.db_table, 'assessment_user_completed_idx',
+         AssessmentResponse.objects.filter(user_id=1).order_by('-completed_at')),
+        ('assessment history page after a cursor', AssessmentResponse._meta.db_table, 'assessment_user_completed_idx',
+         AssessmentResponse.objects.filter(user_id=1)
+         .filter(keyset_filter(HISTORY_ORDERING, [month_ago, 1])).order_by(*HISTORY_ORDERING)[:21]),
+        ('history chart series', AssessmentResponse._meta.db_table, 'assessment_user_completed_idx',
+         AssessmentResponse.objects.filter(user_id=1).order_by('completed_at', 'id')
+         .values_list('completed_at', 'total_score')),
+        ('admin risk level filter', AssessmentResponse._meta.db_table, 'assessment_risk_completed_idx',
+         AssessmentResponse.objects.filter(risk_level='high', completed_at__gte=month_ago)),
+        ('admin questionnaire filter', AssessmentResponse._meta.db_table, 'assessment_q_completed_idx',
+         AssessmentResponse.objects.filter(questionnaire_id=1, completed_at__gte=month_ago)),
+        ('anonymous session lookup', AssessmentResponse._meta.db_table, 'assessment_session_idx',
+         AssessmentResponse.objects.filter(session_id='session').order_by('-completed_at')),
+        ('pending result lookup', AssessmentResponse._meta.db_table, None,
+         AssessmentResponse.objects.filter(submission_key='key').values_list('id', flat=True)),
+        ('upcoming appointments', Appointment._meta.db_table, 'appointment_user_status_idx',
+         Appointment.objects.filter(user_id=1, status__in=['scheduled', 'confirmed'], appointment_date__gte=now)
+         .order_by('appointment_date')[:5]),
+        ('bookmarks list', UserBookmark._meta.db_table, 'bookmark_user_created_idx',
+         UserBookmark.objects.filter(user_id=1).order_by('-created_at')),
+    ]
+
+
+def full_scans(plan, table):
+    """Return the plan lines that read every row of ``table``."""
+    if connection.vendor == 'sqlite':
+        # SQLite reports "SCAN <table>" without "USING ... INDEX" for a full table scan
+        return [
+            line for line in plan.splitlines()
+            if f'SCAN {table}' in line and 'INDEX' not in line
+        ]
+    return [line for line in plan.splitlines() if f'Seq Scan on {table}' in line]
@@ -0,0 +1,206 @@
+"""
+Durable local write queue for assessment submissions.
+
+With SQLite, concurrent workers writing submissions contend for the single
+database write lock. When the queue is enabled, a request only appends its
+scored submission to a spool directory (one fsynced file, renamed into place
+atomically) and answers from the in-memory score. A single writer, the
+``drain_submission_queue`` command, then persists the spooled submissions in
+batches, one transaction per batch (group commit). A spool file that cannot
+be loaded or written is moved to the ``failed/`` directory and logged, so it
+never holds up the submissions queued after it.
+
+Configured through the ``ASSESSMENT_WRITE_QUEUE`` setting.
+"""
+import fcntl
+import json
+import logging
+import os
+from pathlib import Path
+import time
+
+from django.conf import settings
+from django.db import DataError, IntegrityError
+
+from .models import AssessmentResponse
+from .submissions import Submission, write_submissions
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SPOOL_DIR': None,
+    'BATCH_SIZE': 500,
+}
+
+SPOOL_SUFFIX = '.json'
+FAILED_DIR = 'failed'
+
+
+def get_queue_settings():
+    options = dict(DEFAULTS)
+    options.update(getattr(settings, 'ASSESSMENT_WRITE_QUEUE', {}))
+    if options['SPOOL_DIR'] is None:
+        options['SPOOL_DIR'] = Path(settings.BASE_DIR) / 'var' / 'submission_queue'
+    options['SPOOL_DIR'] = Path(options['SPOOL_DIR'])
+    return options
+
+
+def is_queue_enabled():
+    return get_queue_settings()['ENABLED']
+
+
+def _spool_dir():
+    spool_dir = get_queue_settings()['SPOOL_DIR']
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    return spool_dir
+
+
+def enqueue_submission(submission):
+    """
+    Append a submission to the spool directory.
+
+    The file is written under a temporary name, fsynced and renamed into
+    place, so the drainer never sees a partial submission and an accepted
+    submission survives a crash.
+    """
+    spool_dir = _spool_dir()
+    name = f'{time.time_ns():020d}-{submission.submission_key}'
+    temp_path = spool_dir / f'.{name}.tmp'
+    final_path = spool_dir / f'{name}{SPOOL_SUFFIX}'
+
+    with open(temp_path, 'w') as spool_file:
+        json.dump(submission.to_dict(), spool_file, separators=(',', ':'))
+        spool_file.flush()
+        os.fsync(spool_file.fileno())
+    os.replace(temp_path, final_path)
+
+
+def find_queued_submission(submission_key):
+    """Return a submission that is still waiting in the queue, or None."""
+    spool_dir = _spool_dir()
+    for path in spool_dir.glob(f'*-{submission_key}{SPOOL_SUFFIX}'):
+        try:
+            with open(path) as spool_file:
+                return Submission.from_dict(json.load(spool_file))
+        except FileNotFoundError:
+            # Drained between the glob and the open
+            return None
+    return None
+
+
+def queue_depth():
+    return sum(1 for path in _spool_dir().glob(f'*{SPOOL_SUFFIX}'))
+
+
+class DrainLock:
+    """Exclusive, non-blocking lock ensuring there is only one queue writer."""
+
+    def __init__(self):
+        self.path = _spool_dir() / '.drain.lock'
+        self.handle = None
+
+    def acquire(self):
+        self.handle = open(self.path, 'w')
+        try:
+            fcntl.flock(self.handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self.handle.close()
+            self.handle = None
+            return False
+        return True
+
+    def release(self):
+        if self.handle is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+            self.handle.close()
+            self.handle = None
+
+
+def quarantine(path, reason):
+    """Move a spool file that cannot be persisted out of the queue, into ``failed/``."""
+    failed_dir = path.parent / FAILED_DIR
+    failed_dir.mkdir(exist_ok=True)
+    os.replace(path, failed_dir / path.name)
+    logger.error('Moved queued submission %s to %s: %s', path.name, failed_dir, reason)
+
+
+def _load_spool_file(path):
+    """Load a spool file, quarantining it if it is not a valid submission."""
+    try:
+        with open(path) as spool_file:
+            return Submission.from_dict(json.load(spool_file))
+    except (ValueError, TypeError, KeyError) as exc:
+        quarantine(path, f'unreadable submission ({exc!r})')
+        return None
+
+
+def drain_batch(batch_size=None):
+    """
+    Persist up to ``batch_size`` queued submissions in one transaction.
+
+    Submissions whose key is already stored (the writer crashed after the
+    commit but before removing the files) are skipped, so draining is
+    idempotent. If the batch cannot be written (a submission refers to a
+    deleted questionnaire or question), its submissions are written one
+    transaction each and the ones that still fail are quarantined.
+
+    Returns:
+        int: Number of spool files processed
+    """
+    batch_size = batch_size or get_queue_settings()['BATCH_SIZE']
+    paths = sorted(_spool_dir().glob(f'*{SPOOL_SUFFIX}'))[:batch_size]
+    if not paths:
+        return 0
+
+    pending = {}
+    for path in paths:
+        submission = _load_spool_file(path)
+        if submission is not None:
+            pending[path] = submission
+
+    stored = set(
+        AssessmentResponse.objects.filter(
+            submission_key__in=[submission.submission_key for submission in pending.values()]
+        ).values_list('submission_key', flat=True)
+    )
+    pending = {path: s for path, s in pending.items() if s.submission_key not in stored}
+
+    try:
+        write_submissions(list(pending.values()))
+    except (IntegrityError, DataError):
+        # Foreign keys are checked at commit, so isolating the bad submission
+        # takes a transaction of its own per submission
+        for path, submission in pending.items():
+            try:
+                write_submissions([submission])
+            except (IntegrityError, DataError) as exc:
+                quarantine(path, f'write failed ({exc})')
+
+    for path in paths:
+        path.unlink(missing_ok=True)
+    return len(paths)
+
+
+def drain_queue(batch_size=None, max_batches=None):
+    """
+    Drain the queue until it is empty or ``max_batches`` batches were written.
+
+    Returns:
+        int: Number of submissions processed, or None if another writer holds the lock
+    """
+    lock = DrainLock()
+    if not lock.acquire():
+        return None
+
+    try:
+        processed = batches = 0
+        while max_batches is None or batches < max_batches:
+            count = drain_batch(batch_size)
+            if not count:
+                break
+            processed += count
+            batches += 1
+        return processed
+    finally:
+        lock.release()
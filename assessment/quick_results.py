@@ -0,0 +1,89 @@
+"""
+Stateless quick assessment results.
+
+With ``QUICK_ASSESSMENT_STATELESS`` enabled, a quick assessment is scored in
+memory and nothing is written: the result page URL carries a signed token
+holding the score, risk level, completion time and the five raw answers.
+The result page renders from the token alone. A logged-in user can then save
+the result to their history; the submission key is derived from the token,
+so saving the same result twice stores it once.
+"""
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+import hashlib
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from .models import AssessmentResponse
+from .scoring import get_quick_scoring_plan
+from .submissions import Submission
+
+QUICK_RESULT_SALT = 'assessment.quick_result'
+
+QuickResult = namedtuple('QuickResult', ['total_score', 'risk_level', 'completed_at', 'values'])
+
+
+def is_stateless_quick_enabled():
+    return getattr(settings, 'QUICK_ASSESSMENT_STATELESS', False)
+
+
+def make_quick_result_token(total_score, risk_level, values, completed_at=None):
+    """
+    Sign a quick assessment result into a compact, URL-safe token.
+
+    Args:
+        total_score (int): The score
+        risk_level (str): The risk level
+        values: The raw answer of each quick question (1-5), in plan order
+        completed_at (datetime): Defaults to now
+    """
+    completed_at = completed_at or timezone.now()
+    payload = [total_score, risk_level, int(completed_at.timestamp()), ''.join(str(int(value)) for value in values)]
+    return signing.dumps(payload, salt=QUICK_RESULT_SALT, compress=True)
+
+
+def read_quick_result_token(token):
+    """
+    Verify and decode a token made by ``make_quick_result_token()``.
+
+    Raises:
+        signing.BadSignature: If the token is invalid, tampered with or expired
+    """
+    max_age = getattr(settings, 'QUICK_RESULT_TOKEN_MAX_AGE', None)
+    try:
+        total_score, risk_level, timestamp, values = signing.loads(token, salt=QUICK_RESULT_SALT, max_age=max_age)
+    except (TypeError, ValueError):
+        raise signing.BadSignature('Malformed quick result token')
+    if risk_level not in dict(AssessmentResponse.RISK_LEVELS):
+        raise signing.BadSignature('Malformed quick result token')
+
+    completed_at = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+    return QuickResult(total_score, risk_level, completed_at, [int(value) for value in values])
+
+
+def build_quick_assessment(result):
+    """Unsaved ``AssessmentResponse`` for rendering a token's result."""
+    return AssessmentResponse(
+        total_score=result.total_score,
+        risk_level=result.risk_level,
+        completed_at=result.completed_at,
+    )
+
+
+def quick_result_submission(token, result, user):
+    """
+    Submission that saves a token's result to ``user``'s history.
+
+    The subscales are recomputed from the answers carried by the token.
+    """
+    _, subscales = get_quick_scoring_plan().score_values(result.values)
+    return Submission(
+        total_score=result.total_score,
+        risk_level=result.risk_level,
+        user_id=user.pk,
+        subscales=subscales,
+        submission_key=hashlib.sha256(f'{user.pk}:{token}'.encode()).hexdigest(),
+        completed_at=result.completed_at,
+    )
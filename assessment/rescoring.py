@@ -0,0 +1,138 @@
+"""
+Vectorized re-scoring of stored assessments.
+
+Answers are streamed from ``QuestionResponse`` in chunks of assessments and
+laid out as a NumPy response matrix (one row per assessment, one column per
+question). Totals for a whole chunk are then one matrix-vector product with
+the weights compiled by the questionnaire's scoring engine, and risk levels
+are reclassified with array operations. Requires NumPy.
+"""
+from itertools import chain
+
+import numpy as np
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from .models import AssessmentResponse, QuestionResponse
+from .utils import QUICK_RISK_THRESHOLDS, RISK_THRESHOLDS, score_baseline
+
+
+def classify_risk_array(values, thresholds):
+    """Vectorized ``utils.classify_risk`` over an array of percentages or scores."""
+    conditions = [values >= threshold for _, threshold in thresholds]
+    choices = [risk_level for risk_level, _ in thresholds]
+    return np.select(conditions, choices, default='low')
+
+
+class ChunkRescorer:
+    """Recomputes totals and risk levels for chunks of one questionnaire's assessments."""
+
+    def __init__(self, plan):
+        """
+        Args:
+            plan (ScoringPlan): Current scoring plan of the questionnaire
+        """
+        self.plan = plan
+        min_score, self.max_score = plan.score_bounds()
+        self.baseline = score_baseline(min_score)
+        # Columns are ordered by question id so answers can be placed with searchsorted
+        order = np.argsort(np.array(plan.question_ids, dtype=np.int64))
+        self.question_ids = np.array(plan.question_ids, dtype=np.int64)[order]
+        self.weights = np.array(plan.weights, dtype=np.float64)[order]
+        self.offset = plan.offset
+        self.option_ids = np.array(plan.option_ids, dtype=np.int64)
+        self.option_values = np.array(plan.option_values, dtype=np.int64)
+
+    def response_matrix(self, assessment_ids):
+        """
+        Build the response matrix for a sorted array of assessment ids.
+
+        Returns:
+            tuple: ``(matrix, answered)`` where ``answered`` flags assessments
+            that have at least one stored answer
+        """
+        rows = (
+            QuestionResponse.objects.filter(
+                assessment_id__gte=assessment_ids[0],
+                assessment_id__lte=assessment_ids[-1],
+                assessment__questionnaire_id=self.plan.questionnaire_id,
+            )
+            .values_list(
+                'assessment_id',
+                'question_id',
+                Coalesce('selected_option_id', Value(0)),
+                Coalesce('scale_value', Value(0)),
+            )
+            .iterator(chunk_size=10000)
+        )
+        data = np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 4)
+        matrix = np.zeros((len(assessment_ids), len(self.question_ids)), dtype=np.int64)
+        answered = np.zeros(len(assessment_ids), dtype=bool)
+        if not len(data):
+            return matrix, answered
+
+        assessment_col, question_col, option_col, scale_col = data.T
+
+        # Drop answers to questions that are no longer part of the plan
+        question_index = np.searchsorted(self.question_ids, question_col)
+        in_plan = question_index < len(self.question_ids)
+        in_plan[in_plan] = self.question_ids[question_index[in_plan]] == question_col[in_plan]
+
+        # Resolve selected options to their current values; scale answers keep their value
+        values = scale_col
+        if len(self.option_ids):
+            option_index = np.minimum(np.searchsorted(self.option_ids, option_col), len(self.option_ids) - 1)
+            is_option = (option_col > 0) & (self.option_ids[option_index] == option_col)
+            values = np.where(is_option, self.option_values[option_index], scale_col)
+
+        row_index = np.searchsorted(assessment_ids, assessment_col)
+        np.add.at(matrix, (row_index[in_plan], question_index[in_plan]), values[in_plan])
+        answered[row_index] = True
+        return matrix, answered
+
+    def rescore(self, assessment_ids, stored_scores):
+        """
+        Recompute totals and risk levels for a chunk.
+
+        Assessments without any stored answers keep their stored total.
+
+        Returns:
+            tuple: ``(total_scores, risk_levels)`` arrays aligned with ``assessment_ids``
+        """
+        matrix, answered = self.response_matrix(assessment_ids)
+        totals = np.where(answered, np.rint(matrix @ self.weights + self.offset).astype(np.int64), stored_scores)
+        # Same percentages as utils.score_percentage
+        score_range = self.max_score - self.baseline
+        if score_range > 0:
+            percentages = (totals - self.baseline) / score_range * 100
+        else:
+            percentages = np.zeros(len(totals))
+        return totals, classify_risk_array(percentages, RISK_THRESHOLDS)
+
+
+class QuickRescorer:
+    """Recomputes risk levels of quick assessments from their stored totals."""
+
+    def rescore(self, assessment_ids, stored_scores):
+        return stored_scores, classify_risk_array(stored_scores, QUICK_RISK_THRESHOLDS)
+
+
+def iter_chunks(questionnaire_id, after_id=0, chunk_size=50000):
+    """
+    Yield stored assessments of a questionnaire in chunks ordered by id.
+
+    Yields:
+        tuple: ``(ids, total_scores, risk_levels)`` NumPy arrays
+    """
+    queryset = AssessmentResponse.objects.filter(questionnaire_id=questionnaire_id)
+    while True:
+        rows = list(
+            queryset.filter(id__gt=after_id)
+            .order_by('id')
+            .values_list('id', 'total_score', 'risk_level')[:chunk_size]
+        )
+        if not rows:
+            return
+        ids, scores, risk_levels = zip(*rows)
+        yield np.array(ids, dtype=np.int64), np.array(scores, dtype=np.int64), np.array(risk_levels)
+        after_id = ids[-1]
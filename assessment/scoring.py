@@ -0,0 +1,365 @@
+"""
+Scoring engines and precompiled scoring plans.
+
+A scoring plan is an immutable, in-memory snapshot of everything needed to
+score a submission for one questionnaire: the ids and types of its required
+questions, an option-id -> value map held in compact arrays, and the flat
+weight/offset arrays produced by the questionnaire's scoring engine. Plans
+are compiled once per questionnaire version and cached per process, so
+scoring a submission does not touch the database and the total is a single
+dot product of the answer values with the weights.
+
+Scoring engines are registered by name with ``register_scoring_engine`` and
+selected through ``Questionnaire.scoring_algorithm``. The quick assessment is
+scored by the same engines through ``get_quick_scoring_plan``.
+"""
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from operator import mul
+import threading
+
+from .models import Question, QuestionOption
+
+
+CHOICE_TYPES = ('single_choice', 'multiple_choice')
+SCALE_TYPES = ('scale', 'scale_extended')
+SCALE_BOUNDS = {'scale': (1, 5), 'scale_extended': (1, 10)}
+
+# Quick assessment items: (form field, dimension, reverse scored)
+QUICK_ASSESSMENT_ITEMS = (
+    ('mood_question', 'mood', False),
+    ('sleep_question', 'sleep', False),
+    ('stress_question', 'stress', True),  # Higher stress = lower score
+    ('social_question', 'social', False),
+    ('energy_question', 'energy', False),
+)
+QUICK_ASSESSMENT_ALGORITHM = 'weighted'
+
+_engines = {}
+
+_plans = {}
+_plans_lock = threading.Lock()
+_quick_plan = None
+
+
+# A question as seen by the scoring engines. ``low``/``high`` bound the raw
+# answer value: the sum of the selected option values or the scale value.
+ScoringItem = namedtuple(
+    'ScoringItem',
+    ['field_name', 'question_id', 'question_type', 'dimension', 'weight', 'reverse_scored', 'low', 'high'],
+)
+
+ScoreResult = namedtuple('ScoreResult', ['total_score', 'answers', 'subscales'])
+
+
+def register_scoring_engine(name):
+    """Class decorator registering a scoring engine under ``name``."""
+    def decorator(engine_class):
+        _engines[name] = engine_class()
+        return engine_class
+    return decorator
+
+
+def get_scoring_engine(name):
+    """
+    Return the scoring engine registered under ``name``.
+
+    Raises:
+        KeyError: If no engine is registered under that name
+    """
+    try:
+        return _engines[name]
+    except KeyError:
+        raise KeyError(f'No scoring engine registered as "{name}"') from None
+
+
+@register_scoring_engine('sum')
+class SumScoringEngine:
+    """Plain sum of the answer values; question weights and reverse flags are ignored."""
+
+    def compile(self, items):
+        """
+        Compile items to flat arrays so that ``item score = weight * value + offset``.
+
+        Returns:
+            tuple: ``(weights, offsets)``
+        """
+        return [1.0] * len(items), [0.0] * len(items)
+
+
+@register_scoring_engine('weighted')
+class WeightedScoringEngine:
+    """Weighted sum where reverse-keyed items are mirrored within their range."""
+
+    def compile(self, items):
+        weights = []
+        offsets = []
+        for item in items:
+            if item.reverse_scored:
+                # weight * (low + high - value)
+                weights.append(-item.weight)
+                offsets.append(item.weight * (item.low + item.high))
+            else:
+                weights.append(item.weight)
+                offsets.append(0.0)
+        return weights, offsets
+
+
+class ScoringPlan:
+    """
+    Immutable scoring plan for a single questionnaire version.
+
+    Items are stored as parallel tuples (``field_names``, ``question_ids``,
+    ``question_types``, ``dimensions``) alongside the compiled ``weights`` and
+    ``offsets`` arrays. Options are stored as three parallel arrays sorted by
+    option id, so resolving a selected option is a bisect rather than a query.
+    """
+
+    __slots__ = (
+        'questionnaire_id', 'version', 'algorithm', 'field_names', 'question_ids',
+        'question_types', 'dimensions', 'weights', 'offsets', 'offset',
+        'item_bounds', 'option_ids', 'option_values', 'option_questions',
+    )
+
+    def __init__(self, questionnaire_id, version, algorithm, items, options=()):
+        """
+        Args:
+            questionnaire_id (int): Id of the compiled questionnaire (None for the quick assessment)
+            version: Questionnaire version the plan was compiled from
+            algorithm (str): Name of the scoring engine
+            items (list): ``ScoringItem`` tuples in question order
+            options (list): ``(option_id, question_id, value)`` triples
+        """
+        weights, offsets = get_scoring_engine(algorithm).compile(items)
+        options = sorted(options)
+        values = {
+            'questionnaire_id': questionnaire_id,
+            'version': version,
+            'algorithm': algorithm,
+            'field_names': tuple(item.field_name for item in items),
+            'question_ids': tuple(item.question_id for item in items),
+            'question_types': tuple(item.question_type for item in items),
+            'dimensions': tuple(item.dimension for item in items),
+            'weights': array('d', weights),
+            'offsets': array('d', offsets),
+            'offset': sum(offsets),
+            'item_bounds': tuple((item.low, item.high) for item in items),
+            'option_ids': array('q', (o[0] for o in options)),
+            'option_questions': array('q', (o[1] for o in options)),
+            'option_values': array('q', (o[2] for o in options)),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ScoringPlan is immutable')
+
+    def __len__(self):
+        return len(self.field_names)
+
+    def option_value(self, question_id, option_id):
+        """
+        Resolve the score value of an option belonging to a question.
+
+        Raises:
+            KeyError: If the option does not exist or belongs to another question
+        """
+        option_id = int(option_id)
+        index = bisect_left(self.option_ids, option_id)
+        if (index == len(self.option_ids)
+                or self.option_ids[index] != option_id
+                or self.option_questions[index] != question_id):
+            raise KeyError(f'Option {option_id} is not valid for question {question_id}')
+        return self.option_values[index]
+
+    def answer_values(self, cleaned_data):
+        """
+        Reduce a validated submission to one raw value per item.
+
+        Returns:
+            tuple: ``(values, answers)`` where ``answers`` is a list of
+            ``(question_id, option_id, scale_value, score)`` tuples to store
+        """
+        values = []
+        answers = []
+
+        for field_name, question_id, question_type in zip(self.field_names, self.question_ids, self.question_types):
+            value = cleaned_data.get(field_name)
+            item_value = 0
+
+            if value in (None, '', []):
+                pass
+
+            elif question_type in CHOICE_TYPES:
+                option_ids = value if isinstance(value, (list, tuple)) else [value]
+                for option_id in option_ids:
+                    option_value = self.option_value(question_id, option_id)
+                    item_value += option_value
+                    answers.append((question_id, int(option_id), None, option_value))
+
+            elif question_type in SCALE_TYPES:
+                item_value = int(value)
+                if question_id is not None:
+                    answers.append((question_id, None, item_value, item_value))
+
+            values.append(item_value)
+
+        return values, answers
+
+    def score_values(self, values):
+        """
+        Score raw item values: one dot product with the weights, plus subscales.
+
+        Returns:
+            tuple: ``(total_score, subscales)``
+        """
+        total = sum(map(mul, self.weights, values)) + self.offset
+
+        subscales = {}
+        for dimension, weight, offset, value in zip(self.dimensions, self.weights, self.offsets, values):
+            if dimension:
+                subscales[dimension] = subscales.get(dimension, 0) + weight * value + offset
+
+        return round(total), {dimension: round(score) for dimension, score in subscales.items()}
+
+    def score(self, cleaned_data):
+        """
+        Score a validated submission.
+
+        Args:
+            cleaned_data (dict): ``cleaned_data`` of the assessment form
+
+        Returns:
+            ScoreResult: ``(total_score, answers, subscales)`` where ``answers``
+            is a list of ``(question_id, option_id, scale_value, score)`` tuples
+        """
+        values, answers = self.answer_values(cleaned_data)
+        total_score, subscales = self.score_values(values)
+        return ScoreResult(total_score, answers, subscales)
+
+    def score_bounds(self):
+        """
+        Compute the lowest and highest total score a submission can reach.
+
+        Returns:
+            tuple: ``(min_score, max_score)``
+        """
+        min_score = max_score = self.offset
+        for weight, (low, high) in zip(self.weights, self.item_bounds):
+            min_score += min(weight * low, weight * high)
+            max_score += max(weight * low, weight * high)
+        return round(min_score), round(max_score)
+
+
+def item_bounds(question_type, values):
+    """
+    Range of the raw value of a question.
+
+    Single choice questions range over their lowest/highest option, multiple
+    choice questions over the sum of their negative/positive options (at
+    least one option must be picked), scales over their range and text
+    questions contribute nothing.
+
+    Returns:
+        tuple: ``(low, high)``
+    """
+    if question_type == 'single_choice' and values:
+        return min(values), max(values)
+
+    if question_type == 'multiple_choice' and values:
+        negative = sum(value for value in values if value < 0)
+        positive = sum(value for value in values if value > 0)
+        return (negative if negative else min(values)), (positive if positive else max(values))
+
+    return SCALE_BOUNDS.get(question_type, (0, 0))
+
+
+def load_plan_rows(questionnaire_id):
+    """
+    Load the scoring items and option rows a plan is compiled from.
+
+    Costs two queries regardless of the number of questions.
+
+    Returns:
+        tuple: ``(items, options)`` as accepted by ``ScoringPlan``
+    """
+    questions = list(
+        Question.objects.filter(questionnaire_id=questionnaire_id, is_required=True)
+        .order_by('order', 'id')
+        .values_list('id', 'question_type', 'dimension', 'weight', 'reverse_scored')
+    )
+    options = list(
+        QuestionOption.objects.filter(
+            question__questionnaire_id=questionnaire_id,
+            question__is_required=True,
+        ).values_list('id', 'question_id', 'value')
+    )
+
+    values_by_question = {}
+    for _, question_id, value in options:
+        values_by_question.setdefault(question_id, []).append(value)
+
+    items = [
+        ScoringItem(
+            f'question_{question_id}', question_id, question_type, dimension, weight, reverse_scored,
+            *item_bounds(question_type, values_by_question.get(question_id)),
+        )
+        for question_id, question_type, dimension, weight, reverse_scored in questions
+    ]
+    return items, options
+
+
+def compile_scoring_plan(questionnaire):
+    """Compile a scoring plan for a questionnaire from the database."""
+    items, options = load_plan_rows(questionnaire.pk)
+    return ScoringPlan(
+        questionnaire.pk, questionnaire.content_version, questionnaire.scoring_algorithm, items, options
+    )
+
+
+def compute_score_bounds(questionnaire_id, algorithm):
+    """
+    Compute a questionnaire's score bounds from the database.
+
+    Returns:
+        tuple: ``(min_score, max_score)``
+    """
+    items, options = load_plan_rows(questionnaire_id)
+    return ScoringPlan(questionnaire_id, None, algorithm, items, options).score_bounds()
+
+
+def get_scoring_plan(questionnaire):
+    """
+    Return the cached scoring plan for a questionnaire, compiling it if needed.
+
+    Plans are keyed on ``questionnaire.content_version``, which is bumped
+    whenever a question or option changes, so a stale plan is never served
+    even when the change was made by another process.
+    """
+    plan = _plans.get(questionnaire.pk)
+    if plan is not None and plan.version == questionnaire.content_version:
+        return plan
+
+    plan = compile_scoring_plan(questionnaire)
+    with _plans_lock:
+        _plans[questionnaire.pk] = plan
+    return plan
+
+
+def invalidate_scoring_plan(questionnaire_id):
+    """Drop the cached scoring plan for a questionnaire in this process."""
+    with _plans_lock:
+        _plans.pop(questionnaire_id, None)
+
+
+def get_quick_scoring_plan():
+    """Return the scoring plan of the five-question quick assessment."""
+    global _quick_plan
+    if _quick_plan is None:
+        items = [
+            ScoringItem(field_name, None, 'scale', dimension, 1.0, reverse_scored, *SCALE_BOUNDS['scale'])
+            for field_name, dimension, reverse_scored in QUICK_ASSESSMENT_ITEMS
+        ]
+        _quick_plan = ScoringPlan(None, None, QUICK_ASSESSMENT_ALGORITHM, items)
+    return _quick_plan
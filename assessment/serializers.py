@@ -0,0 +1,85 @@
+"""
+Serializers for the REST API.
+
+The viewsets in ``assessment.api`` shape their querysets for these
+serializers: ``question_count`` is an annotation, and the nested questions
+and options are prefetched, so serializing never queries per object.
+"""
+from rest_framework import serializers
+
+from .batch import MAX_BATCH_SUBMISSIONS
+from .models import AssessmentResponse, Question, QuestionOption, Questionnaire
+from .percentiles import score_percentile
+
+
+class QuestionOptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuestionOption
+        fields = ('id', 'text', 'value', 'order')
+
+
+class QuestionSerializer(serializers.ModelSerializer):
+    options = QuestionOptionSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ('id', 'text', 'question_type', 'dimension', 'order', 'is_required', 'options')
+
+
+class QuestionnaireSerializer(serializers.ModelSerializer):
+    question_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Questionnaire
+        fields = (
+            'id', 'name', 'description', 'scoring_algorithm', 'min_possible_score', 'max_possible_score',
+            'question_count', 'updated_at',
+        )
+
+
+class QuestionnaireDetailSerializer(QuestionnaireSerializer):
+    questions = QuestionSerializer(many=True, read_only=True)
+
+    class Meta(QuestionnaireSerializer.Meta):
+        fields = QuestionnaireSerializer.Meta.fields + ('questions',)
+
+
+class AssessmentResultSerializer(serializers.ModelSerializer):
+    questionnaire_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AssessmentResponse
+        fields = (
+            'id', 'questionnaire', 'questionnaire_name', 'total_score', 'subscale_scores', 'risk_level',
+            'completed_at',
+        )
+        read_only_fields = fields
+
+    def get_questionnaire_name(self, obj):
+        return obj.questionnaire.name if obj.questionnaire_id else 'Quick Assessment'
+
+
+class AssessmentResultDetailSerializer(AssessmentResultSerializer):
+    percentile = serializers.SerializerMethodField()
+
+    class Meta(AssessmentResultSerializer.Meta):
+        fields = AssessmentResultSerializer.Meta.fields + ('percentile',)
+        read_only_fields = fields
+
+    def get_percentile(self, obj):
+        return score_percentile(obj)
+
+
+class SubmissionItemSerializer(serializers.Serializer):
+    """Envelope of one offline submission; the answers are validated by ``assessment.batch``."""
+
+    key = serializers.CharField(max_length=128)
+    questionnaire = serializers.IntegerField(allow_null=True, default=None)
+    completed_at = serializers.DateTimeField()
+    answers = serializers.DictField()
+
+
+class SubmissionBatchSerializer(serializers.Serializer):
+    submissions = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=MAX_BATCH_SUBMISSIONS
+    )
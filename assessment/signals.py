@@ -0,0 +1,74 @@
+"""
+Signal handlers for the assessment app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.sync import record_change
+
+from .bands import invalidate_result_band_index
+from .forms import invalidate_assessment_form_class
+from .models import AssessmentResult, Question, QuestionOption, Questionnaire
+from .scoring import compute_score_bounds, invalidate_scoring_plan
+
+
+def questionnaire_content_changed(questionnaire_id):
+    """
+    Mark a questionnaire's content as changed.
+
+    Recomputes the stored score bounds and bumps ``updated_at`` so every
+    process sees a new version on its next read, then drops the local
+    scoring plan and form class straight away.
+    """
+    algorithm = Questionnaire.objects.filter(pk=questionnaire_id).values_list('scoring_algorithm', flat=True).first()
+    if algorithm is None:
+        return
+    
+    min_score, max_score = compute_score_bounds(questionnaire_id, algorithm)
+    Questionnaire.objects.filter(pk=questionnaire_id).update(
+        min_possible_score=min_score,
+        max_possible_score=max_score,
+        updated_at=timezone.now(),
+    )
+    record_change(Questionnaire, questionnaire_id)
+    invalidate_scoring_plan(questionnaire_id)
+    invalidate_assessment_form_class(questionnaire_id)
+
+
+@receiver(post_save, sender=Questionnaire)
+def questionnaire_saved(sender, instance, raw=False, **kwargs):
+    # The scoring algorithm changes the bounds; the save itself already bumped updated_at
+    if raw:
+        return
+    min_score, max_score = compute_score_bounds(instance.pk, instance.scoring_algorithm)
+    if (min_score, max_score) != (instance.min_possible_score, instance.max_possible_score):
+        Questionnaire.objects.filter(pk=instance.pk).update(
+            min_possible_score=min_score,
+            max_possible_score=max_score,
+        )
+        instance.min_possible_score, instance.max_possible_score = min_score, max_score
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    questionnaire_content_changed(instance.questionnaire_id)
+
+
+@receiver(post_save, sender=QuestionOption)
+@receiver(post_delete, sender=QuestionOption)
+def question_option_changed(sender, instance, **kwargs):
+    questionnaire_id = (
+        Question.objects.filter(pk=instance.question_id)
+        .values_list('questionnaire_id', flat=True)
+        .first()
+    )
+    if questionnaire_id is not None:
+        questionnaire_content_changed(questionnaire_id)
+
+
+@receiver(post_save, sender=AssessmentResult)
+@receiver(post_delete, sender=AssessmentResult)
+def assessment_result_changed(sender, instance, **kwargs):
+    invalidate_result_band_index()
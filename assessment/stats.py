@@ -0,0 +1,104 @@
+"""
+Maintenance of the per-user assessment statistics rollup.
+
+``UserAssessmentStats`` is updated in the same transaction that stores each
+new assessment, so dashboards read a single row instead of aggregating the
+user's whole history. ``rebuild_user_stats`` recomputes it from scratch.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AssessmentResponse, UserAssessmentStats
+
+
+def record_user_stats(submissions):
+    """
+    Add new submissions to their users' rollups.
+
+    Must run inside the transaction that stores the submissions.
+    """
+    by_user = {}
+    for submission in submissions:
+        if submission.user_id:
+            by_user.setdefault(submission.user_id, []).append(submission)
+
+    for user_id, user_submissions in by_user.items():
+        stats, _ = UserAssessmentStats.objects.select_for_update().get_or_create(user_id=user_id)
+        for submission in user_submissions:
+            stats.record(submission.total_score, submission.risk_level, submission.completed_at)
+        stats.save()
+
+
+def get_user_stats(user):
+    """Return a user's rollup, or an empty unsaved one if they have no assessments yet."""
+    return UserAssessmentStats.objects.filter(user=user).first() or UserAssessmentStats(user=user)
+
+
+def rebuild_user_stats(user_ids=None):
+    """
+    Recompute rollups from the assessment history.
+
+    Args:
+        user_ids (list): Only rebuild these users (defaults to every user with assessments)
+
+    Returns:
+        int: Number of rollups written
+    """
+    assessments = AssessmentResponse.objects.filter(user__isnull=False)
+    if user_ids is not None:
+        assessments = assessments.filter(user_id__in=user_ids)
+        UserAssessmentStats.objects.filter(user_id__in=user_ids).delete()
+    else:
+        UserAssessmentStats.objects.all().delete()
+
+    totals = (
+        assessments.values('user_id')
+        .annotate(
+            assessment_count=Count('id'),
+            score_sum=Sum('total_score'),
+            min_score=Min('total_score'),
+            max_score=Max('total_score'),
+            last_completed_at=Max('completed_at'),
+            low_count=Count('id', filter=Q(risk_level='low')),
+            moderate_count=Count('id', filter=Q(risk_level='moderate')),
+            high_count=Count('id', filter=Q(risk_level='high')),
+        )
+        .order_by()
+    )
+
+    window_start = timezone.now() - timedelta(days=UserAssessmentStats.WINDOW_DAYS)
+    windows = {}
+    daily = (
+        assessments.filter(completed_at__gte=window_start)
+        .annotate(day=TruncDate('completed_at'))
+        .values('user_id', 'day')
+        .annotate(count=Count('id'), score_sum=Sum('total_score'))
+        .order_by()
+    )
+    for row in daily:
+        windows.setdefault(row['user_id'], {})[row['day'].isoformat()] = [row['count'], row['score_sum']]
+
+    written = 0
+    batch = []
+    for row in totals.iterator():
+        last = (
+            assessments.filter(user_id=row['user_id'], completed_at=row['last_completed_at'])
+            .order_by('-id')
+            .values_list('total_score', 'risk_level')
+            .first()
+        )
+        stats = UserAssessmentStats(daily_window=windows.get(row['user_id'], {}), **row)
+        stats.last_score, stats.last_risk_level = last
+        stats.prune_window()
+        batch.append(stats)
+
+        if len(batch) >= 1000:
+            UserAssessmentStats.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+
+    UserAssessmentStats.objects.bulk_create(batch)
+    return written + len(batch)
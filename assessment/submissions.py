@@ -0,0 +1,218 @@
+"""
+Write path for assessment submissions.
+
+A submission (the assessment row, one row per answer, the user's progress
+entry and the statistics rollups) is persisted in a single transaction using
+``bulk_create``, so a full questionnaire costs one commit instead of one per
+row. Several
+submissions can share that transaction (group commit), which is how the
+write queue drains.
+
+Changing or deleting stored assessments bypasses that path, so the caller
+collects the affected rollups in a ``RollupScope`` and rebuilds them with
+``rebuild_rollups()``.
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import logging
+import time
+import uuid
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .analytics import rebuild_daily_rollups, record_daily_rollups
+from .models import AssessmentResponse, QuestionResponse, UserProgress
+from .percentiles import rebuild_score_histograms, record_score_histograms
+from .stats import rebuild_user_stats, record_user_stats
+from .utils import generate_session_id
+
+logger = logging.getLogger(__name__)
+
+
+def new_submission_key():
+    return uuid.uuid4().hex
+
+
+@dataclass
+class Submission:
+    """A scored submission that has not been persisted yet."""
+
+    total_score: int
+    risk_level: str
+    questionnaire_id: int = None
+    user_id: int = None
+    session_id: str = None
+    ip_address: str = None
+    answers: list = field(default_factory=list)  # (question_id, option_id, scale_value, score)
+    subscales: dict = field(default_factory=dict)
+    submission_key: str = field(default_factory=new_submission_key)
+    completed_at: datetime = field(default_factory=timezone.now)
+
+    @classmethod
+    def from_request(cls, request, total_score, risk_level, questionnaire=None, answers=(), subscales=None):
+        """Build a submission for the current request's user or anonymous session."""
+        authenticated = request.user.is_authenticated
+        return cls(
+            total_score=total_score,
+            risk_level=risk_level,
+            questionnaire_id=questionnaire.pk if questionnaire else None,
+            user_id=request.user.pk if authenticated else None,
+            session_id=None if authenticated else generate_session_id(request),
+            ip_address=request.META.get('REMOTE_ADDR'),
+            answers=list(answers),
+            subscales=dict(subscales or {}),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a submission serialized with ``to_dict()``."""
+        data = dict(data)
+        data['completed_at'] = datetime.fromisoformat(data['completed_at'])
+        data['answers'] = [tuple(answer) for answer in data['answers']]
+        return cls(**data)
+
+    def to_dict(self):
+        """Serialize the submission to JSON-compatible types."""
+        data = asdict(self)
+        data['completed_at'] = self.completed_at.isoformat()
+        return data
+
+    def build_assessment(self):
+        return AssessmentResponse(
+            user_id=self.user_id,
+            questionnaire_id=self.questionnaire_id,
+            session_id=self.session_id,
+            submission_key=self.submission_key,
+            total_score=self.total_score,
+            subscale_scores=self.subscales,
+            risk_level=self.risk_level,
+            completed_at=self.completed_at,
+            ip_address=self.ip_address,
+        )
+
+    def build_responses(self, assessment):
+        return [
+            QuestionResponse(
+                assessment=assessment,
+                question_id=question_id,
+                selected_option_id=option_id,
+                scale_value=scale_value,
+                score=score,
+            )
+            for question_id, option_id, scale_value, score in self.answers
+        ]
+
+    def build_progress(self, assessment):
+        return UserProgress(
+            user_id=self.user_id,
+            assessment=assessment,
+            score_change=self.total_score,
+            risk_level_change=self.risk_level,
+        )
+
+
+def _insert_assessments(assessments):
+    """Insert assessment rows, making sure each gets its primary key back."""
+    if connection.features.can_return_rows_from_bulk_insert:
+        AssessmentResponse.objects.bulk_create(assessments)
+    else:
+        for assessment in assessments:
+            assessment.save(force_insert=True)
+
+
+def write_submissions(submissions):
+    """
+    Persist several submissions in one transaction (group commit).
+
+    Args:
+        submissions (list): ``Submission`` objects
+
+    Returns:
+        list: The saved ``AssessmentResponse`` objects, in the same order
+    """
+    if not submissions:
+        return []
+
+    started = time.perf_counter()
+
+    with transaction.atomic():
+        assessments = [submission.build_assessment() for submission in submissions]
+        _insert_assessments(assessments)
+
+        responses = []
+        progress = []
+        for submission, assessment in zip(submissions, assessments):
+            responses.extend(submission.build_responses(assessment))
+            if submission.user_id:
+                progress.append(submission.build_progress(assessment))
+
+        if responses:
+            QuestionResponse.objects.bulk_create(responses)
+        if progress:
+            UserProgress.objects.bulk_create(progress)
+
+        record_user_stats(submissions)
+        record_daily_rollups(submissions)
+        record_score_histograms(submissions)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for assessment in assessments:
+        assessment.write_latency_ms = elapsed_ms
+    logger.info(
+        'Persisted %d assessment(s) (%d answers) in %.2f ms',
+        len(assessments), len(responses), elapsed_ms,
+    )
+    return assessments
+
+
+def write_submission(submission):
+    """
+    Persist a submission atomically.
+
+    Args:
+        submission (Submission): The scored submission
+
+    Returns:
+        AssessmentResponse: The saved assessment, with the write latency in
+        milliseconds available as ``write_latency_ms``
+    """
+    return write_submissions([submission])[0]
+
+
+@dataclass
+class RollupScope:
+    """The users, days and questionnaires whose rollups count some stored assessments."""
+
+    user_ids: set = field(default_factory=set)
+    days: set = field(default_factory=set)
+    questionnaire_ids: set = field(default_factory=set)  # None stands for quick assessments
+
+    def add(self, assessments):
+        """Add the rollups counting an ``AssessmentResponse`` queryset."""
+        rows = assessments.values_list('user_id', 'completed_at', 'questionnaire_id').order_by()
+        for user_id, completed_at, questionnaire_id in rows.iterator():
+            if user_id:
+                self.user_ids.add(user_id)
+            self.days.add(timezone.localdate(completed_at))
+            self.questionnaire_ids.add(questionnaire_id)
+        return self
+
+    def __bool__(self):
+        return bool(self.days)
+
+
+def rebuild_rollups(scope):
+    """
+    Recompute the user statistics, daily rollups and score histograms in ``scope``.
+
+    Rebuilt statistics rows get a new ``updated_at``, so the user's API
+    validators change with them.
+    """
+    if not scope:
+        return
+    with transaction.atomic():
+        if scope.user_ids:
+            rebuild_user_stats(list(scope.user_ids))
+        rebuild_daily_rollups(days=scope.days)
+        rebuild_score_histograms(scope.questionnaire_ids)
@@ -21,3 +21,11 @@ def get_risk_level_color(risk_level):
         'high': 'text-red-600 bg-red-100'
     }
     return colors.get(risk_level, 'text-gray-600 bg-gray-100')
+
+@register.filter
+def ordinal_suffix(value):
+    """Format an integer as an ordinal (1st, 2nd, 3rd, 11th...)."""
+    value = int(value)
+    if value % 100 in (11, 12, 13):
+        return f'{value}th'
+    return f"{value}{ {1: 'st', 2: 'nd', 3: 'rd'}.get(value % 10, 'th') }"
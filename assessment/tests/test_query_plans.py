@@ -0,0 +1,24 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from assessment.query_plans import explain_settings, full_scans, hot_queries
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'Query plans are only checked on SQLite and PostgreSQL')
+class HotQueryPlanTests(TestCase):
+    """The hot view queries keep using their indexes (EXPLAIN, no data needed)."""
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            for statement in explain_settings():
+                cursor.execute(statement)
+
+    def test_hot_queries_use_their_index(self):
+        for name, table, index, queryset in hot_queries():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertEqual(full_scans(plan, table), [], f'{name} scans all of {table}:\n{plan}')
+                if index is not None:
+                    self.assertIn(index, plan)
@@ -0,0 +1,156 @@
+"""
+Score history series for charts.
+
+A user's history is read as a flat ``(completed_at, total_score)`` stream into
+two compact arrays, optionally aggregated per week or month, and reduced to
+at most the requested number of points with Largest-Triangle-Three-Buckets
+(LTTB). LTTB keeps the first and last point and, for every bucket in
+between, the point forming the largest triangle with its neighbours, which
+preserves peaks and dips that plain averaging would flatten.
+"""
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+from .models import AssessmentResponse
+
+PERIODS = ('week', 'month')
+DEFAULT_POINTS = 200
+MAX_POINTS = 2000
+
+
+def lttb(xs, ys, threshold):
+    """
+    Downsample a series with Largest-Triangle-Three-Buckets.
+
+    Args:
+        xs: Ascending x values (any indexable sequence of numbers)
+        ys: y values, same length as ``xs``
+        threshold (int): Maximum number of points to keep
+
+    Returns:
+        list: Indexes of the kept points, ascending
+    """
+    length = len(xs)
+    if length <= threshold:
+        return list(range(length))
+    if threshold < 3:
+        return [0, length - 1][:threshold]
+
+    kept = [0]
+    bucket_size = (length - 2) / (threshold - 2)
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # The next bucket's average is the third corner of the triangle
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        prev_x, prev_y = xs[previous], ys[previous]
+        best_area = -1.0
+        best = start
+        for index in range(start, end):
+            area = abs(
+                (prev_x - avg_x) * (ys[index] - prev_y)
+                - (prev_x - xs[index]) * (avg_y - prev_y)
+            )
+            if area > best_area:
+                best_area = area
+                best = index
+
+        kept.append(best)
+        previous = best
+
+    kept.append(length - 1)
+    return kept
+
+
+def period_start(moment, period):
+    """Local start date of the week (Monday) or month containing ``moment``."""
+    day = timezone.localtime(moment).date()
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def aggregate_by_period(rows, period):
+    """
+    Average ``(completed_at, score)`` rows per week or month.
+
+    Args:
+        rows: Iterable of ``(completed_at, score)`` ordered by time
+        period (str): ``'week'`` or ``'month'``
+
+    Returns:
+        list: ``(period_start, average_score, count)`` tuples
+    """
+    buckets = []
+    current = None
+    total = count = 0
+    for completed_at, score in rows:
+        start = period_start(completed_at, period)
+        if start != current:
+            if count:
+                buckets.append((current, total / count, count))
+            current, total, count = start, 0, 0
+        total += score
+        count += 1
+    if count:
+        buckets.append((current, total / count, count))
+    return buckets
+
+
+def user_score_series(user, points=DEFAULT_POINTS, period=None, questionnaire_id=None, chunk_size=2000):
+    """
+    Build a user's downsampled score series.
+
+    Args:
+        user: The user whose history is charted
+        points (int): Maximum number of points returned
+        period (str): Optional ``'week'`` or ``'month'`` aggregation
+        questionnaire_id (int): Only chart this questionnaire
+
+    Returns:
+        dict: ``points`` (list of dicts with ``t``, ``score`` and, when
+        aggregated, ``count``) plus the size of the full series
+    """
+    assessments = AssessmentResponse.objects.filter(user=user)
+    if questionnaire_id is not None:
+        assessments = assessments.filter(questionnaire_id=questionnaire_id)
+    rows = (
+        assessments.order_by('completed_at', 'id')
+        .values_list('completed_at', 'total_score')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    if period:
+        buckets = aggregate_by_period(rows, period)
+        labels = [start.isoformat() for start, _, _ in buckets]
+        xs = array('d', (start.toordinal() for start, _, _ in buckets))
+        ys = array('d', (average for _, average, _ in buckets))
+        counts = [count for _, _, count in buckets]
+    else:
+        xs = array('d')
+        ys = array('d')
+        for completed_at, score in rows:
+            xs.append(completed_at.timestamp())
+            ys.append(score)
+        labels = counts = None
+
+    series = []
+    for index in lttb(xs, ys, points):
+        if labels is None:
+            moment = datetime.fromtimestamp(xs[index], tz=dt_timezone.utc)
+            point = {'t': timezone.localtime(moment).isoformat(), 'score': int(ys[index])}
+        else:
+            point = {'t': labels[index], 'score': round(ys[index], 2), 'count': counts[index]}
+        series.append(point)
+
+    return {'points': series, 'total_points': len(xs), 'period': period}
@@ -9,9 +9,12 @@ urlpatterns = [
     path('start/', views.start_assessment, name='start_assessment'),
     path('quick/', views.quick_assessment, name='quick_assessment'),
     path('quick/result/<int:assessment_id>/', views.quick_result, name='quick_result'),
+    path('quick/result/t/<str:token>/', views.quick_result_token, name='quick_result_token'),
+    path('quick/result/t/<str:token>/save/', views.save_quick_result, name='save_quick_result'),
     path('<int:pk>/', views.AssessmentDetailView.as_view(), name='assessment_detail'),
     path('take/<int:questionnaire_id>/', views.take_assessment, name='take_assessment'),
     path('result/<int:assessment_id>/', views.assessment_result, name='assessment_result'),
+    path('result/pending/<slug:submission_key>/', views.pending_result, name='pending_result'),
     
     # User dashboard and history
     path('dashboard/', views.user_dashboard, name='dashboard'),
@@ -5,6 +5,46 @@ import uuid
 from django.contrib.sessions.models import Session
 
 
+# Risk thresholds, highest first. Full questionnaires are classified on the
+# percentage of their maximum score, quick assessments on the raw total
+# (5 questions, max 5 points each = 25 max).
+RISK_THRESHOLDS = (('high', 70), ('moderate', 40))
+QUICK_RISK_THRESHOLDS = (('high', 18), ('moderate', 12))
+
+
+def score_baseline(min_possible_score):
+    """
+    The score a questionnaire's percentages are measured from.
+    
+    Percentages are of the maximum score (measured from 0), which is how
+    results have always been classified. Only questionnaires that can score
+    below 0 (negative option values) are measured from their minimum, since
+    a percentage of the maximum means nothing for them.
+    """
+    return min(min_possible_score, 0)
+
+
+def score_percentage(total_score, min_possible_score, max_possible_score):
+    """
+    Place a total score within a questionnaire's score range.
+    
+    Returns:
+        float: Percentage of the range reached, from ``score_baseline()``
+        (0 when the range is empty)
+    """
+    baseline = score_baseline(min_possible_score)
+    score_range = max_possible_score - baseline
+    return ((total_score - baseline) / score_range) * 100 if score_range > 0 else 0
+
+
+def classify_risk(value, thresholds):
+    """Map a percentage or raw score to a risk level using ``thresholds``."""
+    for risk_level, threshold in thresholds:
+        if value >= threshold:
+            return risk_level
+    return 'low'
+
+
 def calculate_risk_level(total_score, questionnaire):
     """
     Calculate risk level based on total score.
@@ -17,24 +57,13 @@ def calculate_risk_level(total_score, questionnaire):
         str: Risk level ('low', 'moderate', 'high')
     """
     if questionnaire:
-        # For full questionnaires, use more sophisticated scoring
-        max_possible_score = questionnaire.questions.filter(is_required=True).count() * 5  # Assuming max 5 points per question
-        percentage = (total_score / max_possible_score) * 100 if max_possible_score > 0 else 0
-        
-        if percentage >= 70:
-            return 'high'
-        elif percentage >= 40:
-            return 'moderate'
-        else:
-            return 'low'
+        # For full questionnaires, place the score within the stored bounds
+        percentage = score_percentage(
+            total_score, questionnaire.min_possible_score, questionnaire.max_possible_score
+        )
+        return classify_risk(percentage, RISK_THRESHOLDS)
     else:
-        # For quick assessments (5 questions, max 5 points each = 25 max)
-        if total_score >= 18:
-            return 'high'
-        elif total_score >= 12:
-            return 'moderate'
-        else:
-            return 'low'
+        return classify_risk(total_score, QUICK_RISK_THRESHOLDS)
 
 
 def generate_session_id(request):
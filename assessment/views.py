@@ -1,17 +1,39 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.core.signing import BadSignature
+from django.http import Http404
+from django.views.decorators.http import condition
 from django.views.generic import ListView, DetailView, CreateView
 from django.urls import reverse_lazy
-from django.db.models import Avg, Count
+from django.db.models import Count
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time
 import json
 
-from .models import Questionnaire, AssessmentResponse, QuestionResponse, AssessmentResult, UserProgress
-from .forms import AssessmentForm, AssessmentStartForm, QuickAssessmentForm
-from .utils import calculate_risk_level, generate_session_id
+from core.renderers import api_response
+
+from .models import Questionnaire, AssessmentResponse
+from .analytics import DEFAULT_TREND_DAYS, daily_trend, questionnaire_summary
+from .bands import get_result_band_index
+from .etags import (
+    analytics_etag, assessment_result_etag, questionnaire_list_etag, questionnaire_list_last_modified,
+    user_history_etag, user_history_last_modified, user_history_series_etag, user_results_batch_etag,
+)
+from .forms import AssessmentStartForm, QuickAssessmentForm, get_assessment_form_class
+from .pagination import InvalidCursor, page_size_from_request, paginate_keyset
+from .percentiles import score_percentile
+from .quick_results import (
+    build_quick_assessment, is_stateless_quick_enabled, make_quick_result_token,
+    quick_result_submission, read_quick_result_token,
+)
+from .queue import enqueue_submission, find_queued_submission, is_queue_enabled
+from .scoring import get_quick_scoring_plan, get_scoring_plan
+from .stats import get_user_stats
+from .timeseries import DEFAULT_POINTS, MAX_POINTS, PERIODS, user_score_series
+from .submissions import Submission, write_submission
+from .utils import calculate_risk_level
 
 
 class AssessmentListView(ListView):
@@ -48,80 +70,36 @@ def take_assessment(request, questionnaire_id):
     """Take an assessment."""
     questionnaire = get_object_or_404(Questionnaire, id=questionnaire_id, is_active=True)
     
+    form_class = get_assessment_form_class(questionnaire)
+    
     if request.method == 'POST':
-        form = AssessmentForm(questionnaire, request.POST)
+        form = form_class(questionnaire, request.POST)
         if form.is_valid():
-            # Calculate total score
-            total_score = 0
-            responses = []
-            
-            for question in questionnaire.questions.filter(is_required=True):
-                field_name = f'question_{question.id}'
-                if field_name in form.cleaned_data:
-                    value = form.cleaned_data[field_name]
-                    
-                    if question.question_type in ['single_choice', 'multiple_choice']:
-                        if isinstance(value, list):  # Multiple choice
-                            for option_id in value:
-                                option = question.options.get(id=option_id)
-                                total_score += option.value
-                                responses.append({
-                                    'question': question,
-                                    'option': option,
-                                    'score': option.value
-                                })
-                        else:  # Single choice
-                            option = question.options.get(id=value)
-                            total_score += option.value
-                            responses.append({
-                                'question': question,
-                                'option': option,
-                                'score': option.value
-                            })
-                    
-                    elif question.question_type in ['scale', 'scale_extended']:
-                        total_score += value
-                        responses.append({
-                            'question': question,
-                            'scale_value': value,
-                            'score': value
-                        })
+            # Score against the precompiled plan (no per-answer queries)
+            plan = get_scoring_plan(questionnaire)
+            total_score, answers, subscales = plan.score(form.cleaned_data)
             
             # Determine risk level
             risk_level = calculate_risk_level(total_score, questionnaire)
             
-            # Create assessment response
-            assessment = AssessmentResponse.objects.create(
-                user=request.user if request.user.is_authenticated else None,
+            submission = Submission.from_request(
+                request, total_score, risk_level,
                 questionnaire=questionnaire,
-                session_id=generate_session_id(request) if not request.user.is_authenticated else None,
-                total_score=total_score,
-                risk_level=risk_level,
-                ip_address=request.META.get('REMOTE_ADDR')
+                answers=answers,
+                subscales=subscales,
             )
             
-            # Save individual responses
-            for response_data in responses:
-                QuestionResponse.objects.create(
-                    assessment=assessment,
-                    question=response_data['question'],
-                    selected_option=response_data.get('option'),
-                    scale_value=response_data.get('scale_value'),
-                    score=response_data['score']
-                )
+            # With the write queue on, answer from the in-memory score and let the queue writer persist it
+            if is_queue_enabled():
+                enqueue_submission(submission)
+                return redirect('assessment:pending_result', submission_key=submission.submission_key)
             
-            # Create user progress entry if user is logged in
-            if request.user.is_authenticated:
-                UserProgress.objects.create(
-                    user=request.user,
-                    assessment=assessment,
-                    score_change=total_score,
-                    risk_level_change=risk_level
-                )
+            # Persist the assessment, its answers and progress in one transaction
+            assessment = write_submission(submission)
             
             return redirect('assessment:assessment_result', assessment_id=assessment.id)
     else:
-        form = AssessmentForm(questionnaire)
+        form = form_class(questionnaire)
     
     return render(request, 'assessment/take_assessment.html', {
         'form': form,
@@ -133,20 +111,36 @@ def assessment_result(request, assessment_id):
     """Display assessment results."""
     assessment = get_object_or_404(AssessmentResponse, id=assessment_id)
     
-    # Get the appropriate result template based on risk level
-    try:
-        result_template = AssessmentResult.objects.filter(
-            risk_level=assessment.risk_level,
-            min_score__lte=assessment.total_score,
-            max_score__gte=assessment.total_score,
-            is_active=True
-        ).first()
-    except AssessmentResult.DoesNotExist:
-        result_template = None
+    # Get the appropriate result template from the in-memory band index
+    result_template = get_result_band_index().lookup(assessment.risk_level, assessment.total_score)
+    
+    return render(request, 'assessment/assessment_result.html', {
+        'assessment': assessment,
+        'result_template': result_template,
+        'percentile': score_percentile(assessment)
+    })
+
+
+def pending_result(request, submission_key):
+    """Display results for a submission that may still be in the write queue."""
+    assessment_id = AssessmentResponse.objects.filter(
+        submission_key=submission_key
+    ).values_list('id', flat=True).first()
+    if assessment_id is not None:
+        return redirect('assessment:assessment_result', assessment_id=assessment_id)
+    
+    submission = find_queued_submission(submission_key)
+    if submission is None:
+        raise Http404('Assessment not found')
+    
+    assessment = submission.build_assessment()
+    result_template = get_result_band_index().lookup(assessment.risk_level, assessment.total_score)
     
     return render(request, 'assessment/assessment_result.html', {
         'assessment': assessment,
-        'result_template': result_template
+        'result_template': result_template,
+        'percentile': score_percentile(assessment),
+        'is_pending': True
     })
 
 
@@ -155,27 +149,21 @@ def quick_assessment(request):
     if request.method == 'POST':
         form = QuickAssessmentForm(request.POST)
         if form.is_valid():
-            # Calculate score (reverse scale for stress question)
-            scores = []
-            for field_name, value in form.cleaned_data.items():
-                if field_name == 'stress_question':
-                    # Reverse scale for stress (higher stress = lower score)
-                    scores.append(6 - value)
-                else:
-                    scores.append(value)
-            
-            total_score = sum(scores)
+            # Calculate score (the stress question is reverse-keyed in the quick plan)
+            plan = get_quick_scoring_plan()
+            total_score, _, subscales = plan.score(form.cleaned_data)
             risk_level = calculate_risk_level(total_score, None)  # Quick assessment
             
+            if is_stateless_quick_enabled():
+                # Nothing is stored: the result travels in a signed token
+                values, _ = plan.answer_values(form.cleaned_data)
+                token = make_quick_result_token(total_score, risk_level, values)
+                return redirect('assessment:quick_result_token', token=token)
+            
             # Create a temporary assessment response
-            assessment = AssessmentResponse.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                questionnaire=None,  # Quick assessment
-                session_id=generate_session_id(request) if not request.user.is_authenticated else None,
-                total_score=total_score,
-                risk_level=risk_level,
-                ip_address=request.META.get('REMOTE_ADDR')
-            )
+            assessment = write_submission(Submission.from_request(
+                request, total_score, risk_level, subscales=subscales
+            ))
             
             return redirect('assessment:quick_result', assessment_id=assessment.id)
     else:
@@ -189,10 +177,48 @@ def quick_result(request, assessment_id):
     assessment = get_object_or_404(AssessmentResponse, id=assessment_id)
     
     return render(request, 'assessment/quick_result.html', {
-        'assessment': assessment
+        'assessment': assessment,
+        'percentile': score_percentile(assessment)
+    })
+
+
+def _read_quick_result_token(token):
+    try:
+        return read_quick_result_token(token)
+    except BadSignature:
+        raise Http404('Result not found')
+
+
+def quick_result_token(request, token):
+    """Display quick assessment results carried by a signed token (stateless mode)."""
+    assessment = build_quick_assessment(_read_quick_result_token(token))
+    
+    return render(request, 'assessment/quick_result.html', {
+        'assessment': assessment,
+        'percentile': score_percentile(assessment),
+        'result_token': token
     })
 
 
+@login_required
+def save_quick_result(request, token):
+    """Save a stateless quick assessment result to the logged-in user's history."""
+    if request.method != 'POST':
+        return redirect('assessment:quick_result_token', token=token)
+    
+    submission = quick_result_submission(token, _read_quick_result_token(token), request.user)
+    
+    # The key is derived from the token, so a repeated save finds the first one
+    assessment_id = AssessmentResponse.objects.filter(
+        submission_key=submission.submission_key
+    ).values_list('id', flat=True).first()
+    if assessment_id is None:
+        assessment_id = write_submission(submission).id
+        messages.success(request, 'Your result has been saved to your history.')
+    
+    return redirect('assessment:quick_result', assessment_id=assessment_id)
+
+
 @login_required
 def user_dashboard(request):
     """User dashboard with assessment history."""
@@ -201,68 +227,224 @@ def user_dashboard(request):
     # Get recent assessments
     recent_assessments = AssessmentResponse.objects.filter(user=user).order_by('-completed_at')[:5]
     
-    # Get assessment history for charts
-    all_assessments = AssessmentResponse.objects.filter(user=user).order_by('completed_at')
-    
-    # Calculate statistics
-    total_assessments = all_assessments.count()
-    avg_score = all_assessments.aggregate(avg_score=Avg('total_score'))['avg_score'] or 0
-    
-    # Risk level distribution
-    risk_distribution = all_assessments.values('risk_level').annotate(count=Count('risk_level'))
-    
-    # Recent trend (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_trend = all_assessments.filter(completed_at__gte=thirty_days_ago)
+    # Statistics come from the rollup maintained with every new assessment
+    stats = get_user_stats(user)
     
     return render(request, 'assessment/dashboard.html', {
         'recent_assessments': recent_assessments,
-        'all_assessments': all_assessments,
-        'total_assessments': total_assessments,
-        'avg_score': round(avg_score, 2),
-        'risk_distribution': risk_distribution,
-        'recent_trend': recent_trend
+        'stats': stats,
+        'total_assessments': stats.assessment_count,
+        'avg_score': round(stats.average_score, 2),
+        'risk_distribution': stats.risk_distribution,
+        'recent_trend': stats.recent_window(),
     })
 
 
+HISTORY_ORDERING = ('-completed_at', '-id')
+
+
 @login_required
 def assessment_history(request):
-    """Detailed assessment history for logged-in users."""
-    assessments = AssessmentResponse.objects.filter(user=request.user).order_by('-completed_at')
+    """Detailed assessment history for logged-in users, newest first, one page at a time."""
+    assessments = AssessmentResponse.objects.filter(user=request.user).select_related('questionnaire')
+    
+    try:
+        page = paginate_keyset(
+            assessments, HISTORY_ORDERING, request.GET.get('cursor'), page_size_from_request(request)
+        )
+    except InvalidCursor:
+        raise Http404('Invalid page')
     
     return render(request, 'assessment/history.html', {
-        'assessments': assessments
+        'assessments': page.items,
+        'page': page,
+        'is_first_page': not request.GET.get('cursor')
     })
 
 
+RESULT_FIELDS = ('id', 'questionnaire__name', 'total_score', 'risk_level', 'completed_at')
+MAX_BATCH_RESULTS = 500
+
+
+def _result_data(row):
+    """JSON for a ``values(*RESULT_FIELDS)`` row."""
+    return {
+        'id': row['id'],
+        'total_score': row['total_score'],
+        'risk_level': row['risk_level'],
+        'completed_at': row['completed_at'].isoformat(),
+        'questionnaire_name': row['questionnaire__name'] or 'Quick Assessment'
+    }
+
+
+def _invalid_cursor_response(request):
+    return api_response(request, {'error': 'Invalid cursor'}, status=400)
+
+
 # API Views for mobile/frontend integration
+@condition(etag_func=questionnaire_list_etag, last_modified_func=questionnaire_list_last_modified)
 def assessment_api_list(request):
-    """API endpoint for listing assessments."""
-    questionnaires = Questionnaire.objects.filter(is_active=True)
-    data = []
-    
-    for questionnaire in questionnaires:
-        data.append({
-            'id': questionnaire.id,
-            'name': questionnaire.name,
-            'description': questionnaire.description,
-            'question_count': questionnaire.questions.count()
-        })
+    """API endpoint for listing assessments (paginated with ``?cursor=`` and ``?limit=``)."""
+    questionnaires = (
+        Questionnaire.objects.filter(is_active=True)
+        .annotate(question_count=Count('questions'))
+        .values('id', 'name', 'description', 'question_count')
+    )
+    
+    try:
+        page = paginate_keyset(
+            questionnaires, ('id',), request.GET.get('cursor'), page_size_from_request(request)
+        )
+    except InvalidCursor:
+        return _invalid_cursor_response(request)
+    
+    return api_response(request, {'assessments': page.items, 'next_cursor': page.next_cursor})
+
+
+@condition(etag_func=user_history_etag, last_modified_func=user_history_last_modified)
+def assessment_api_history(request):
+    """API endpoint for the logged-in user's assessments, newest first (paginated like the list)."""
+    if not request.user.is_authenticated:
+        return api_response(request, {'error': 'Authentication required'}, status=401)
+    
+    assessments = AssessmentResponse.objects.filter(user=request.user).values(*RESULT_FIELDS)
     
-    return JsonResponse({'assessments': data})
+    try:
+        page = paginate_keyset(
+            assessments, HISTORY_ORDERING, request.GET.get('cursor'), page_size_from_request(request)
+        )
+    except InvalidCursor:
+        return _invalid_cursor_response(request)
+    
+    data = [_result_data(row) for row in page.items]
+    return api_response(request, {'assessments': data, 'next_cursor': page.next_cursor})
 
 
+@condition(etag_func=assessment_result_etag)
 def assessment_api_result(request, assessment_id):
     """API endpoint for getting assessment results."""
     try:
-        assessment = AssessmentResponse.objects.get(id=assessment_id)
+        assessment = AssessmentResponse.objects.select_related('questionnaire').get(id=assessment_id)
         data = {
             'id': assessment.id,
             'total_score': assessment.total_score,
             'risk_level': assessment.risk_level,
             'completed_at': assessment.completed_at.isoformat(),
-            'questionnaire_name': assessment.questionnaire.name if assessment.questionnaire else 'Quick Assessment'
+            'questionnaire_name': assessment.questionnaire.name if assessment.questionnaire else 'Quick Assessment',
+            'percentile': score_percentile(assessment)
         }
-        return JsonResponse(data)
+        return api_response(request, data)
     except AssessmentResponse.DoesNotExist:
-        return JsonResponse({'error': 'Assessment not found'}, status=404)
+        return api_response(request, {'error': 'Assessment not found'}, status=404)
+
+
+@condition(etag_func=user_results_batch_etag)
+def assessment_api_results_batch(request):
+    """
+    API endpoint for many of the logged-in user's results in one response.
+    
+    Either ``?ids=1,2,3`` (up to ``MAX_BATCH_RESULTS``; ids that do not exist
+    or belong to someone else are listed under ``missing``) or a time range
+    ``?since=&until=`` (ISO dates or datetimes, newest first, paginated with
+    ``?cursor=`` and ``?limit=``). Ownership is part of the single query.
+    """
+    if not request.user.is_authenticated:
+        return api_response(request, {'error': 'Authentication required'}, status=401)
+    
+    assessments = AssessmentResponse.objects.filter(user=request.user).values(*RESULT_FIELDS)
+    
+    if 'ids' in request.GET:
+        try:
+            ids = list(dict.fromkeys(int(value) for value in request.GET['ids'].split(',') if value))
+        except ValueError:
+            return api_response(request, {'error': 'ids must be a comma-separated list of integers'}, status=400)
+        if len(ids) > MAX_BATCH_RESULTS:
+            return api_response(request, {'error': f'At most {MAX_BATCH_RESULTS} ids per request'}, status=400)
+        
+        rows = {row['id']: row for row in assessments.filter(id__in=ids)}
+        return api_response(request, {
+            'results': [_result_data(rows[assessment_id]) for assessment_id in ids if assessment_id in rows],
+            'missing': [assessment_id for assessment_id in ids if assessment_id not in rows],
+        })
+    
+    for name, lookup in (('since', 'gte'), ('until', 'lt')):
+        value = request.GET.get(name)
+        if not value:
+            continue
+        try:
+            # Well-formed values that are not real dates (2024-02-30) raise ValueError
+            moment = parse_datetime(value)
+            if moment is None and parse_date(value) is not None:
+                moment = datetime.combine(parse_date(value), time.min)
+        except ValueError:
+            moment = None
+        if moment is None:
+            return api_response(request, {'error': f'{name} must be an ISO date or datetime'}, status=400)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        assessments = assessments.filter(**{f'completed_at__{lookup}': moment})
+    
+    try:
+        page = paginate_keyset(
+            assessments, HISTORY_ORDERING, request.GET.get('cursor'),
+            page_size_from_request(request, default=MAX_BATCH_RESULTS, maximum=MAX_BATCH_RESULTS)
+        )
+    except InvalidCursor:
+        return _invalid_cursor_response(request)
+    
+    return api_response(request, {
+        'results': [_result_data(row) for row in page.items], 'next_cursor': page.next_cursor
+    })
+
+
+@condition(etag_func=user_history_series_etag)
+def assessment_api_history_series(request):
+    """
+    API endpoint for the logged-in user's score history, downsampled for charts.
+    
+    Query parameters: ``points`` (maximum points returned), ``period``
+    (``week`` or ``month`` aggregation) and ``questionnaire`` (id).
+    """
+    if not request.user.is_authenticated:
+        return api_response(request, {'error': 'Authentication required'}, status=401)
+    
+    try:
+        points = int(request.GET.get('points', DEFAULT_POINTS))
+        questionnaire_id = request.GET.get('questionnaire')
+        questionnaire_id = int(questionnaire_id) if questionnaire_id else None
+    except ValueError:
+        return api_response(request, {'error': 'points and questionnaire must be integers'}, status=400)
+    
+    period = request.GET.get('period') or None
+    if period is not None and period not in PERIODS:
+        return api_response(request, {'error': f"period must be one of: {', '.join(PERIODS)}"}, status=400)
+    
+    points = max(3, min(points, MAX_POINTS))
+    return api_response(request, user_score_series(request.user, points, period, questionnaire_id))
+
+
+@condition(etag_func=analytics_etag)
+def assessment_api_analytics(request):
+    """
+    API endpoint for platform analytics (staff only), read from the daily rollups.
+    
+    Query parameters: ``days`` (window length, default 90) and
+    ``questionnaire`` (an id, or ``quick`` for quick assessments).
+    """
+    if not request.user.is_staff:
+        return api_response(request, {'error': 'Staff access required'}, status=403)
+    
+    questionnaire = request.GET.get('questionnaire')
+    quick = questionnaire == 'quick'
+    try:
+        days = int(request.GET.get('days', DEFAULT_TREND_DAYS))
+        questionnaire_id = int(questionnaire) if questionnaire and not quick else None
+    except ValueError:
+        return api_response(request, {'error': 'days and questionnaire must be integers'}, status=400)
+    
+    days = max(1, min(days, 366))
+    return api_response(request, {
+        'days': days,
+        'trend': daily_trend(days, questionnaire_id, quick),
+        'questionnaires': questionnaire_summary(days),
+    })
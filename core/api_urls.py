@@ -0,0 +1,17 @@
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+
+from assessment.api import AssessmentResultViewSet, QuestionnaireViewSet, SubmissionBatchView
+from resources.api import ResourceViewSet, UserBookmarkViewSet
+
+app_name = 'api_v1'
+
+router = DefaultRouter()
+router.register('questionnaires', QuestionnaireViewSet, basename='questionnaire')
+router.register('results', AssessmentResultViewSet, basename='result')
+router.register('resources', ResourceViewSet, basename='resource')
+router.register('bookmarks', UserBookmarkViewSet, basename='bookmark')
+
+urlpatterns = [
+    path('submissions/batch/', SubmissionBatchView.as_view(), name='submission_batch'),
+] + router.urls
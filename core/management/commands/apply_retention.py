@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.retention import apply_retention, get_policies
+
+
+class Command(BaseCommand):
+    help = 'Delete data past its retention period in small, time-budgeted batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy', action='append', dest='policies',
+            help='Only apply this policy (repeatable): ' + ', '.join(get_policies()),
+        )
+        parser.add_argument('--batch-size', type=int, help='Maximum rows deleted per transaction')
+        parser.add_argument('--sleep', type=float, help='Seconds to pause between batches')
+        parser.add_argument('--time-budget', type=float, help='Seconds a run may take before it stops')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be deleted')
+        parser.add_argument('--loop', action='store_true', help='Keep applying the policies periodically')
+        parser.add_argument('--interval', type=float, default=3600, help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        policies = get_policies()
+        unknown = set(options['policies'] or ()) - set(policies)
+        if unknown:
+            raise CommandError(f"Unknown policy: {', '.join(sorted(unknown))}")
+
+        if options['dry_run']:
+            for name in options['policies'] or policies:
+                self.stdout.write(f'{name}: {policies[name].expired().count()} row(s) past retention')
+            return
+
+        while True:
+            reports = apply_retention(
+                options['policies'],
+                batch_size=options['batch_size'],
+                sleep=options['sleep'],
+                time_budget=options['time_budget'],
+            )
+            for report in reports:
+                status = 'done' if report.complete else 'time budget reached'
+                self.stdout.write(
+                    f'{report.policy}: deleted {report.deleted} row(s) in {report.batches} batch(es), '
+                    f'{report.elapsed:.1f} s, {report.rows_per_second:.0f} rows/s ({status})'
+                )
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
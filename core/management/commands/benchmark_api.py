@@ -0,0 +1,90 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from assessment.models import AssessmentResponse
+from assessment.serializers import AssessmentResultSerializer
+from core.renderers import ORJSONRenderer, orjson
+
+# (label, URL) pairs: the hand-rolled JsonResponse views next to their REST API counterparts
+ENDPOINTS = [
+    ('questionnaires (views)', '/api/assessments/?limit=100'),
+    ('questionnaires (api/v1)', '/api/v1/questionnaires/'),
+    ('history (views)', '/api/history/?limit=100'),
+    ('results (api/v1)', '/api/v1/results/?limit=100'),
+    ('resources (api/v1)', '/api/v1/resources/'),
+    ('bookmarks (api/v1)', '/api/v1/bookmarks/?limit=100'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare queries, latency and serialization throughput of the JSON views and the REST API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to authenticate as (defaults to the user with most assessments)')
+        parser.add_argument('--iterations', type=int, default=50, help='Requests per endpoint')
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        iterations = options['iterations']
+
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        self.stdout.write(f'Authenticated as {user.username}; orjson {"enabled" if orjson else "not installed"}')
+        self.stdout.write(f"{'endpoint':<26} {'status':>6} {'queries':>8} {'KB':>8} {'ms/request':>11}")
+        for label, url in ENDPOINTS:
+            self.benchmark_endpoint(client, label, url, iterations)
+
+        self.benchmark_renderers(user, iterations)
+
+    def get_user(self, username):
+        users = get_user_model().objects.all()
+        if username:
+            user = users.filter(username=username).first()
+        else:
+            user = users.annotate(count=Count('assessments')).order_by('-count').first()
+        if user is None:
+            raise CommandError('No user to benchmark with. Run populate_sample_data first.')
+        return user
+
+    def benchmark_endpoint(self, client, label, url, iterations):
+        # The request resets the query log; start from empty so the capture stays aligned
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            client.get(url)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(
+            f'{label:<26} {response.status_code:>6} {len(queries):>8} {len(response.content) / 1024:>8.1f} '
+            f'{elapsed_ms / iterations:>11.2f}'
+        )
+
+    def benchmark_renderers(self, user, iterations):
+        """Render one serialized page of results with each renderer."""
+        assessments = AssessmentResponse.objects.filter(user=user).select_related('questionnaire')[:100]
+        data = AssessmentResultSerializer(assessments, many=True).data
+        if not data:
+            self.stdout.write('No results to render.')
+            return
+
+        self.stdout.write(f'\nRendering {len(data)} serialized result(s) x {iterations}:')
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                size = len(renderer.render(data))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'  {type(renderer).__name__:<16} {elapsed / iterations * 1000:>8.3f} ms/render '
+                f'{size * iterations / elapsed / 1024 / 1024:>8.1f} MB/s'
+            )
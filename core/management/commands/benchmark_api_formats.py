@@ -0,0 +1,88 @@
+import gzip
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.test import Client
+
+from assessment.models import Questionnaire
+from core.renderers import MSGPACK_MEDIA_TYPES, msgpack, orjson
+
+
+class Command(BaseCommand):
+    help = 'Compare encode/decode time and payload size of JSON and MessagePack for the questionnaire and history APIs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to authenticate as (defaults to the user with most assessments)')
+        parser.add_argument('--iterations', type=int, default=200, help='Encodes and decodes per format')
+
+    def handle(self, *args, **options):
+        if msgpack is None:
+            raise CommandError('MessagePack is not available: install the msgpack package.')
+
+        user = self.get_user(options['user'])
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        endpoints = [('/api/assessments/?limit=100', 'questionnaires'), ('/api/history/?limit=100', 'history')]
+        questionnaire = Questionnaire.objects.filter(is_active=True).first()
+        if questionnaire:
+            endpoints.insert(1, (f'/api/v1/questionnaires/{questionnaire.pk}/', 'questionnaire detail'))
+        endpoints.append(('/api/v1/results/?limit=100', 'results'))
+
+        formats = [('json', self.json_codec())]
+        if orjson is not None:
+            formats.append(('orjson', (orjson.dumps, orjson.loads)))
+        formats.append(('msgpack', (lambda data: msgpack.packb(data, use_bin_type=True), msgpack.unpackb)))
+
+        self.stdout.write(f'Authenticated as {user.username}; {options["iterations"]} iteration(s)')
+        self.stdout.write(f"{'endpoint':<22} {'format':<8} {'bytes':>8} {'gzip':>8} {'encode us':>10} {'decode us':>10}")
+        for url, label in endpoints:
+            data = self.fetch(client, url)
+            for name, (encode, decode) in formats:
+                self.benchmark(label, name, data, encode, decode, options['iterations'])
+
+    def get_user(self, username):
+        users = get_user_model().objects.all()
+        if username:
+            user = users.filter(username=username).first()
+        else:
+            user = users.annotate(count=Count('assessments')).order_by('-count').first()
+        if user is None:
+            raise CommandError('No user to benchmark with. Run populate_sample_data first.')
+        return user
+
+    def json_codec(self):
+        return (lambda data: json.dumps(data, cls=DjangoJSONEncoder).encode(), json.loads)
+
+    def fetch(self, client, url):
+        """Fetch an endpoint in both formats and check that they carry the same payload."""
+        response = client.get(url, HTTP_ACCEPT='application/json')
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned HTTP {response.status_code}')
+        data = json.loads(response.content)
+
+        packed = client.get(url, HTTP_ACCEPT=MSGPACK_MEDIA_TYPES[0])
+        if packed['Content-Type'] not in MSGPACK_MEDIA_TYPES or msgpack.unpackb(packed.content) != data:
+            raise CommandError(f'{url} did not negotiate an equivalent MessagePack response')
+        return data
+
+    def benchmark(self, label, name, data, encode, decode, iterations):
+        body = encode(data)
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            encode(data)
+        encode_us = (time.perf_counter() - started) / iterations * 1000000
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            decode(body)
+        decode_us = (time.perf_counter() - started) / iterations * 1000000
+
+        self.stdout.write(
+            f'{label:<22} {name:<8} {len(body):>8} {len(gzip.compress(body)):>8} {encode_us:>10.1f} {decode_us:>10.1f}'
+        )
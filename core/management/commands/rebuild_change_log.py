@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.sync import SYNC_MODELS, rebuild_change_log
+
+
+class Command(BaseCommand):
+    help = 'Record every synced catalog row as changed, after edits that bypassed the change log signals'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', action='append', choices=sorted(SYNC_MODELS),
+            help='Only this model (repeatable; defaults to every synced model)',
+        )
+
+    def handle(self, *args, **options):
+        recorded = rebuild_change_log(options['model'])
+        self.stdout.write(self.style.SUCCESS(f'Recorded {recorded} row(s) in the change log'))
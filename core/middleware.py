@@ -0,0 +1,171 @@
+"""
+Admission control for write endpoints.
+
+Each configured route (by URL name) has a token bucket per client: a burst
+allowance refilled at a steady rate. A request that finds its bucket empty,
+or finds every write slot of this process taken, is rejected with 429 and a
+``Retry-After`` before its view runs.
+
+The client is identified without loading anything: by the API token, the
+session cookie or the CSRF cookie it sends, otherwise by ``REMOTE_ADDR``.
+A client identified by a token or cookie also draws from a larger
+per-address bucket, so minting fresh cookies does not buy a fresh budget; a
+request the address bucket rejects gets its client token back. Buckets live
+in the ``CACHE_ALIAS`` cache (in-process by default), so a rejection costs
+a few cache operations and never touches the database. REST API routes
+(``api_v1:*``) are rejected with a JSON body, like the API's own errors.
+
+Configured through the ``ADMISSION_CONTROL`` setting.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    # Concurrent requests to budgeted routes per process; SQLite has one writer anyway
+    'WRITE_CONCURRENCY': 4,
+    # A client address may spend this many times a single client's budget
+    'ADDRESS_BUDGET_FACTOR': 5,
+    # URL name: (burst, requests per minute); only unsafe methods are counted
+    'ROUTES': {},
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+KEY_PREFIX = 'core.admission'
+API_NAMESPACE = 'api_v1'
+REJECTION_MESSAGE = 'Too many requests, please try again shortly.'
+
+
+def get_admission_settings():
+    options = dict(DEFAULTS)
+    options.update(getattr(settings, 'ADMISSION_CONTROL', {}))
+    return options
+
+
+class TokenBucket:
+    """Token bucket whose state is a ``(tokens, updated_at)`` pair in a cache."""
+
+    def __init__(self, cache, burst, per_minute):
+        self.cache = cache
+        self.burst = burst
+        self.rate = per_minute / 60
+        # An idle bucket is full again after this long, so its entry can expire
+        self.timeout = math.ceil(burst / self.rate) if self.rate else None
+        self.lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """
+        Take one token from the bucket under ``key``.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            tokens, updated_at = self.cache.get(key) or (self.burst, now)
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens < 1:
+                return (1 - tokens) / self.rate if self.rate else math.inf
+            self.cache.set(key, (tokens - 1, now), self.timeout)
+        return 0
+
+    def give_back(self, key, now=None):
+        """Return a token taken from the bucket under ``key`` (never above the burst)."""
+        now = time.time() if now is None else now
+        with self.lock:
+            state = self.cache.get(key)
+            if state is None:
+                # Expired: the bucket is full again
+                return
+            tokens, updated_at = state
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate + 1)
+            self.cache.set(key, (tokens, now), self.timeout)
+
+
+def client_keys(request):
+    """
+    Identify the client.
+
+    Returns:
+        tuple: ``(client, address)`` bucket keys; ``client`` is None when the
+        request carries no API token and no session or CSRF cookie
+    """
+    credential = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+    )
+    client = 'client:' + hashlib.sha1(credential.encode()).hexdigest() if credential else None
+    return client, f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def too_many_requests(request, retry_after):
+    if API_NAMESPACE in request.resolver_match.namespaces:
+        response = JsonResponse({'detail': REJECTION_MESSAGE}, status=429)
+    else:
+        response = HttpResponse(f'{REJECTION_MESSAGE}\n', status=429, content_type='text/plain')
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+class AdmissionControlMiddleware:
+    """Sheds excess write traffic with 429 before it reaches the views (see the module docstring)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options = get_admission_settings()
+        self.enabled = options['ENABLED']
+        cache = caches[options['CACHE_ALIAS']]
+        factor = options['ADDRESS_BUDGET_FACTOR']
+        self.buckets = {
+            route: (TokenBucket(cache, burst, per_minute), TokenBucket(cache, burst * factor, per_minute * factor))
+            for route, (burst, per_minute) in options['ROUTES'].items()
+        }
+        self.write_slots = threading.BoundedSemaphore(options['WRITE_CONCURRENCY'])
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            if getattr(request, '_admission_slot', False):
+                self.write_slots.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled or request.method in SAFE_METHODS:
+            return None
+        route = request.resolver_match.view_name
+        buckets = self.buckets.get(route)
+        if buckets is None:
+            return None
+
+        client_bucket, address_bucket = buckets
+        client, address = client_keys(request)
+        if client is None:
+            # Requests without any credential share one client budget per address
+            checks = [(client_bucket, f'anonymous:{address}')]
+        else:
+            checks = [(client_bucket, client), (address_bucket, address)]
+        # Only admitted requests spend budget: a rejection gives back the tokens already taken
+        taken = []
+        for bucket, key in checks:
+            key = f'{KEY_PREFIX}:{route}:{key}'
+            wait = bucket.take(key)
+            if wait:
+                break
+            taken.append((bucket, key))
+        else:
+            if self.write_slots.acquire(blocking=False):
+                request._admission_slot = True
+                return None
+            wait = 1
+
+        for bucket, key in taken:
+            bucket.give_back(key)
+        return too_many_requests(request, wait)
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:33
+
+from django.db import migrations, models
+
+SYNCED_MODELS = [
+    ('assessment', 'Questionnaire'),
+    ('assessment', 'Question'),
+    ('assessment', 'QuestionOption'),
+    ('resources', 'ResourceCategory'),
+    ('resources', 'Resource'),
+    ('resources', 'CrisisResource'),
+    ('resources', 'FAQ'),
+]
+
+
+def record_existing_rows(apps, schema_editor):
+    """Log the existing catalog so a first sync from token 0 returns all of it."""
+    ChangeLog = apps.get_model('core', 'ChangeLog')
+    for app_label, model_name in SYNCED_MODELS:
+        ids = apps.get_model(app_label, model_name).objects.order_by('pk').values_list('pk', flat=True)
+        ChangeLog.objects.bulk_create(
+            [ChangeLog(model=model_name.lower(), object_id=object_id) for object_id in ids], batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('assessment', '0009_hot_query_indexes'),
+        ('resources', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=32)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='changelog',
+            constraint=models.UniqueConstraint(fields=('model', 'object_id'), name='unique_change_log_object'),
+        ),
+        migrations.RunPython(record_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class ChangeLog(models.Model):
+    """
+    Latest change to a synced catalog row (see ``core.sync``).
+
+    Each row keeps a single entry: a change deletes the previous entry and
+    appends a new one, so the auto-incrementing id doubles as the sync token
+    and the table stays as large as the catalog.
+    """
+
+    model = models.CharField(max_length=32)
+    object_id = models.PositiveBigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        action = "deleted" if self.deleted else "changed"
+        return f"#{self.pk} {self.model} {self.object_id} {action}"
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'object_id'], name='unique_change_log_object'),
+        ]
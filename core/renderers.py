@@ -0,0 +1,144 @@
+"""
+Renderers and parsers shared by the API.
+
+JSON is the default format. orjson serializes several times faster than
+the standard library and returns bytes directly, so the response body is
+built without an extra encode. Values orjson does not know natively
+(Decimal, lazy translation strings, querysets...) go through DRF's own
+``JSONEncoder``, so the output matches ``JSONRenderer``. orjson is
+optional: without it the JSON classes behave exactly like DRF's
+``JSONRenderer`` and ``JSONParser``.
+
+Clients that send ``Accept: application/msgpack`` get MessagePack instead,
+from the REST API views and from the JSON function views (through
+``api_response()``). Maps keep the insertion order of the payload, which is
+the serializer's field order, so every response of an endpoint has the same
+key order. MessagePack needs the optional ``msgpack`` package. Without it
+the format is not offered and every client gets JSON.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import NotAcceptable, ParseError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.request import Request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that serializes with orjson when it is installed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        # orjson only knows one indentation width; any requested indent uses it
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self.encoder_class().default, option=option)
+
+
+class ORJSONParser(JSONParser):
+    """``JSONParser`` that parses with orjson when it is installed."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders MessagePack; values msgpack does not know are converted like DRF's JSON encoder does."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONRenderer.encoder_class
+    available = msgpack is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder_class().default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+    available = msgpack is not None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except ValueError as exc:
+            raise ParseError(f'MessagePack parse error - {exc or type(exc).__name__}')
+
+
+class APIContentNegotiation(DefaultContentNegotiation):
+    """Content negotiation that leaves out formats whose package is not installed."""
+
+    def select_parser(self, request, parsers):
+        return super().select_parser(request, [parser for parser in parsers if getattr(parser, 'available', True)])
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderers = [renderer for renderer in renderers if getattr(renderer, 'available', True)]
+        return super().select_renderer(request, renderers, format_suffix)
+
+
+def wants_msgpack(request):
+    """
+    Whether the request negotiates MessagePack (and it is available).
+
+    Negotiates between the JSON and MessagePack renderers, in the order of
+    ``DEFAULT_RENDERER_CLASSES``, with the REST API's own content negotiation,
+    so the function views pick the same format as the viewsets would.
+    """
+    if msgpack is None:
+        return False
+    if not isinstance(request, Request):
+        request = Request(request)
+    try:
+        renderer, _ = APIContentNegotiation().select_renderer(request, [ORJSONRenderer(), MessagePackRenderer()])
+    except (NotAcceptable, Http404):
+        return False
+    return isinstance(renderer, MessagePackRenderer)
+
+
+def api_response(request, data, status=200, json_dumps_params=None):
+    """
+    Response for a function API view: MessagePack if the client asks for it, JSON otherwise.
+
+    Args:
+        request: The request, for its ``Accept`` header
+        data (dict): The payload
+        status (int): HTTP status
+        json_dumps_params (dict): Passed to ``json.dumps()`` for JSON responses
+    """
+    if wants_msgpack(request):
+        body = msgpack.packb(data, default=DjangoJSONEncoder().default, use_bin_type=True)
+        response = HttpResponse(body, status=status, content_type=MessagePackRenderer.media_type)
+    else:
+        response = JsonResponse(data, status=status, json_dumps_params=json_dumps_params)
+    patch_vary_headers(response, ['Accept'])
+    return response
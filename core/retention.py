@@ -0,0 +1,198 @@
+"""
+Data retention.
+
+Each policy names the rows that have outlived their retention period. They
+are deleted in small batches walked in primary key order, one short
+transaction per batch with a pause in between, so other writers get the
+SQLite write lock back quickly. The batch size adapts so that a batch stays
+under ``MAX_BATCH_SECONDS``. A run stops at its time budget, and the next
+run resumes where it stopped, because the expired rows are simply the ones
+still there.
+
+Configured through the ``DATA_RETENTION`` setting and applied by the
+``apply_retention`` command (once, or periodically with ``--loop``).
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ANONYMOUS_ASSESSMENT_DAYS': 90,
+    'BATCH_SIZE': 500,
+    'MAX_BATCH_SECONDS': 0.5,
+    'SLEEP_SECONDS': 0.1,
+    'TIME_BUDGET_SECONDS': 60,
+}
+
+MIN_BATCH_SIZE = 10
+
+
+def get_retention_settings():
+    options = dict(DEFAULTS)
+    options.update(getattr(settings, 'DATA_RETENTION', {}))
+    return options
+
+
+class RetentionPolicy:
+    """Base class: subclasses define ``name`` and ``expired()``; ``delete_batch()`` may handle children."""
+
+    name = None
+
+    def expired(self):
+        """Queryset of the rows to delete."""
+        raise NotImplementedError
+
+    def delete_batch(self, pks):
+        """Delete one batch of rows; return how many rows of the policy's model were deleted."""
+        model = self.expired().model
+        _, deleted = model.objects.filter(pk__in=pks).delete()
+        return deleted.get(model._meta.label, 0)
+
+
+class AnonymousAssessmentPolicy(RetentionPolicy):
+    """
+    Anonymous assessments (and their answers) older than ``ANONYMOUS_ASSESSMENT_DAYS``.
+
+    The daily rollups and score histograms are aggregates without personal
+    data, so they keep counting deleted assessments.
+    """
+
+    name = 'anonymous_assessments'
+
+    def __init__(self, days):
+        self.days = days
+
+    def expired(self):
+        from assessment.models import AssessmentResponse
+
+        cutoff = timezone.now() - timedelta(days=self.days)
+        return AssessmentResponse.objects.filter(user__isnull=True, completed_at__lt=cutoff)
+
+    def delete_batch(self, pks):
+        from assessment.models import QuestionResponse
+
+        # Delete the answers first so the cascade does not load them into memory
+        QuestionResponse.objects.filter(assessment_id__in=pks).delete()
+        return super().delete_batch(pks)
+
+
+class ExpiredSessionPolicy(RetentionPolicy):
+    """Database sessions past their expiry date."""
+
+    name = 'expired_sessions'
+
+    def expired(self):
+        return Session.objects.filter(expire_date__lt=timezone.now())
+
+
+def get_policies():
+    """The configured policies, by name."""
+    options = get_retention_settings()
+    policies = [
+        AnonymousAssessmentPolicy(options['ANONYMOUS_ASSESSMENT_DAYS']),
+        ExpiredSessionPolicy(),
+    ]
+    return {policy.name: policy for policy in policies}
+
+
+@dataclass
+class RetentionReport:
+    policy: str
+    deleted: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    complete: bool = False
+
+    @property
+    def rows_per_second(self):
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+
+def apply_policy(policy, batch_size=None, sleep=None, time_budget=None, max_batch_seconds=None):
+    """
+    Delete a policy's expired rows in batches until none are left or the time budget runs out.
+
+    Returns:
+        RetentionReport: What was deleted, and whether the policy is fully applied
+    """
+    options = get_retention_settings()
+    max_size = batch_size or options['BATCH_SIZE']
+    sleep = options['SLEEP_SECONDS'] if sleep is None else sleep
+    time_budget = options['TIME_BUDGET_SECONDS'] if time_budget is None else time_budget
+    max_batch_seconds = max_batch_seconds or options['MAX_BATCH_SECONDS']
+
+    report = RetentionReport(policy.name)
+    size = max_size
+    last_pk = None
+    started = time.perf_counter()
+
+    while True:
+        candidates = policy.expired().order_by('pk')
+        if last_pk is not None:
+            candidates = candidates.filter(pk__gt=last_pk)
+        fetched_size = size
+        pks = list(candidates.values_list('pk', flat=True)[:fetched_size])
+        if not pks:
+            report.complete = True
+            break
+
+        batch_started = time.perf_counter()
+        with transaction.atomic():
+            report.deleted += policy.delete_batch(pks)
+        batch_seconds = time.perf_counter() - batch_started
+        report.batches += 1
+        last_pk = pks[-1]
+
+        # Keep each write transaction short: shrink slow batches, grow fast ones back
+        if batch_seconds > max_batch_seconds:
+            size = max(MIN_BATCH_SIZE, size // 2)
+        elif batch_seconds < max_batch_seconds / 4:
+            size = min(max_size, size * 2)
+
+        if len(pks) < fetched_size:
+            report.complete = True
+            break
+        if time.perf_counter() - started + batch_seconds + sleep > time_budget:
+            break
+        time.sleep(sleep)
+
+    report.elapsed = time.perf_counter() - started
+    logger.info(
+        'Retention %s: deleted %d row(s) in %d batch(es), %.1f s (%.0f rows/s)%s',
+        report.policy, report.deleted, report.batches, report.elapsed, report.rows_per_second,
+        '' if report.complete else ', time budget reached',
+    )
+    return report
+
+
+def apply_retention(names=None, **kwargs):
+    """
+    Apply the named policies (all by default) within one shared time budget.
+
+    Returns:
+        list: A ``RetentionReport`` per policy that ran
+    """
+    policies = get_policies()
+    if names:
+        policies = {name: policies[name] for name in names}
+
+    time_budget = kwargs.pop('time_budget', None)
+    if time_budget is None:
+        time_budget = get_retention_settings()['TIME_BUDGET_SECONDS']
+    deadline = time.perf_counter() + time_budget
+
+    reports = []
+    for policy in policies.values():
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        reports.append(apply_policy(policy, time_budget=remaining, **kwargs))
+    return reports
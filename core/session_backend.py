@@ -0,0 +1,99 @@
+"""
+Cache-first session engine.
+
+Sessions live in the ``SESSION_CACHE_ALIAS`` cache and are written through to
+the database only once they hold data (a login, a message, anything a view
+stored). Anonymous visitors whose session just provides a key, such as
+quick-assessment traffic, never touch ``django_session``.
+
+Database writes are coalesced: saving a session whose data has not changed
+since its last database write, within ``SESSION_DB_WRITE_INTERVAL`` seconds,
+only refreshes the cache. ``clear_expired()`` (run by ``clearsessions``)
+deletes expired rows in chunks so it never holds a long write lock.
+
+Enable with ``SESSION_ENGINE = 'core.session_backend'``.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.db import router
+from django.utils import timezone
+
+KEY_PREFIX = 'core.session_backend'
+PRUNE_CHUNK_SIZE = 1000
+
+
+def get_write_interval():
+    return getattr(settings, 'SESSION_DB_WRITE_INTERVAL', 60)
+
+
+class SessionStore(CachedDBStore):
+    """Cached sessions that are persisted to the database only when they carry data."""
+
+    cache_key_prefix = KEY_PREFIX
+
+    @property
+    def write_marker_key(self):
+        return f'{self.cache_key}:db'
+
+    def should_persist(self, data):
+        """Whether the session holds anything worth keeping beyond its key."""
+        return bool(data)
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+
+        data = self._get_session(no_load=must_create)
+        expiry = self.get_expiry_age()
+
+        if must_create:
+            # The cache, not a database INSERT, guarantees the new key is unique
+            if not self._cache.add(self.cache_key, data, expiry):
+                raise CreateError
+        else:
+            self._cache.set(self.cache_key, data, expiry)
+
+        marker = self._cache.get(self.write_marker_key)
+        if self.should_persist(data):
+            self._write_through(data, marker, expiry)
+        elif marker is not None:
+            # The data was cleared; drop the stale row so a cache miss cannot resurrect it
+            super(CachedDBStore, self).delete(self.session_key)
+            self._cache.delete(self.write_marker_key)
+
+    def _write_through(self, data, marker, expiry):
+        digest = hashlib.sha256(self.encode(data).encode()).hexdigest()
+        now = time.time()
+        if marker is not None:
+            last_digest, written_at = marker
+            if last_digest == digest and now - written_at < get_write_interval():
+                return
+
+        obj = self.create_model_instance(data)
+        # Neither force_insert nor force_update: the row may not exist yet
+        obj.save(using=router.db_for_write(self.model, instance=obj))
+        self._cache.set(self.write_marker_key, (digest, now), expiry)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._cache.delete(f'{self.cache_key_prefix}{session_key}:db')
+        super().delete(session_key)
+
+    @classmethod
+    def clear_expired(cls):
+        """Delete expired database sessions in chunks (cache entries expire on their own)."""
+        while True:
+            keys = list(
+                cls.get_model_class().objects.filter(expire_date__lt=timezone.now())
+                .values_list('session_key', flat=True)[:PRUNE_CHUNK_SIZE]
+            )
+            if not keys:
+                return
+            cls.get_model_class().objects.filter(session_key__in=keys).delete()
@@ -0,0 +1,165 @@
+"""
+Delta sync of the content catalog for offline-capable clients.
+
+Saving or deleting a synced row (questionnaires and their questions and
+options, resources and their categories, crisis resources, FAQs) records it
+in ``ChangeLog`` through signals. The log id is the sync token: a client
+sends the token of its last sync and receives only the rows changed since,
+so a sync costs as much as the changes, not the catalog. Rows deactivated
+through their ``is_active`` flag are reported as deleted.
+
+Writes that bypass signals (``QuerySet.update()``, raw SQL) must call
+``record_change()`` themselves; ``rebuild_change_log`` re-records whole
+models after out-of-band changes.
+"""
+from collections import defaultdict, namedtuple
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+
+from .models import ChangeLog
+
+SyncModel = namedtuple('SyncModel', ['label', 'fields', 'active_field'])
+
+# Keyed by model_name; ``fields`` is the column order of the synced rows
+SYNC_MODELS = {
+    'questionnaire': SyncModel(
+        'assessment.Questionnaire',
+        ('id', 'name', 'description', 'scoring_algorithm', 'min_possible_score', 'max_possible_score'),
+        'is_active',
+    ),
+    'question': SyncModel(
+        'assessment.Question',
+        ('id', 'questionnaire_id', 'text', 'question_type', 'dimension', 'order', 'is_required'),
+        None,
+    ),
+    'questionoption': SyncModel(
+        'assessment.QuestionOption',
+        ('id', 'question_id', 'text', 'value', 'order'),
+        None,
+    ),
+    'resourcecategory': SyncModel(
+        'resources.ResourceCategory',
+        ('id', 'name', 'description', 'color', 'icon'),
+        'is_active',
+    ),
+    'resource': SyncModel(
+        'resources.Resource',
+        ('id', 'title', 'description', 'resource_type', 'category_id', 'url', 'phone', 'email', 'address',
+         'is_free', 'is_verified'),
+        'is_active',
+    ),
+    'crisisresource': SyncModel(
+        'resources.CrisisResource',
+        ('id', 'name', 'description', 'phone', 'text_line', 'website', 'is_24_7', 'priority'),
+        'is_active',
+    ),
+    'faq': SyncModel(
+        'resources.FAQ',
+        ('id', 'question', 'answer', 'category', 'order'),
+        'is_active',
+    ),
+}
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 2000
+
+
+def record_change(model, object_id, deleted=False):
+    """Record that a synced row changed (or was deleted), moving it to the end of the log."""
+    key = model._meta.model_name
+    with transaction.atomic():
+        ChangeLog.objects.filter(model=key, object_id=object_id).delete()
+        ChangeLog.objects.create(model=key, object_id=object_id, deleted=deleted)
+
+
+def _row_saved(sender, instance, **kwargs):
+    record_change(sender, instance.pk)
+
+
+def _row_deleted(sender, instance, **kwargs):
+    record_change(sender, instance.pk, deleted=True)
+
+
+def connect_signals():
+    for key, sync_model in SYNC_MODELS.items():
+        model = apps.get_model(sync_model.label)
+        post_save.connect(_row_saved, sender=model, dispatch_uid=f'core.sync.saved.{key}')
+        post_delete.connect(_row_deleted, sender=model, dispatch_uid=f'core.sync.deleted.{key}')
+
+
+def rebuild_change_log(keys=None):
+    """
+    Record every current row of the given models (all synced models by default) as changed.
+
+    Clients download those rows again on their next sync; delete entries
+    are kept so they still learn about removed rows.
+
+    Returns:
+        int: Number of rows recorded
+    """
+    recorded = 0
+    for key in keys or SYNC_MODELS:
+        model = apps.get_model(SYNC_MODELS[key].label)
+        ids = list(model.objects.order_by('pk').values_list('pk', flat=True))
+        with transaction.atomic():
+            ChangeLog.objects.filter(model=key, object_id__in=ids).delete()
+            ChangeLog.objects.bulk_create(
+                [ChangeLog(model=key, object_id=object_id) for object_id in ids], batch_size=500
+            )
+        recorded += len(ids)
+    return recorded
+
+
+def latest_token():
+    return ChangeLog.objects.aggregate(token=Max('id'))['token'] or 0
+
+
+def changes_since(token, limit=DEFAULT_SYNC_LIMIT):
+    """
+    The catalog changes after ``token``, oldest first, at most ``limit`` log entries.
+
+    Returns:
+        dict: ``token`` to send next time, ``has_more`` when the limit cut
+        the changes short, ``changes`` as ``{model: {'fields': [...], 'rows': [[...]]}}``
+        and ``deleted`` as ``{model: [ids]}``
+    """
+    entries = list(
+        ChangeLog.objects.filter(id__gt=token).order_by('id')
+        .values_list('id', 'model', 'object_id', 'deleted')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    changed_ids = defaultdict(list)
+    deleted = defaultdict(list)
+    for _, key, object_id, is_deleted in entries:
+        if key not in SYNC_MODELS:
+            continue
+        (deleted if is_deleted else changed_ids)[key].append(object_id)
+
+    changes = {}
+    for key, ids in changed_ids.items():
+        sync_model = SYNC_MODELS[key]
+        columns = sync_model.fields + ((sync_model.active_field,) if sync_model.active_field else ())
+        rows = []
+        found = set()
+        for row in apps.get_model(sync_model.label).objects.filter(pk__in=ids).order_by('pk').values_list(*columns):
+            found.add(row[0])
+            if sync_model.active_field and not row[-1]:
+                deleted[key].append(row[0])
+            else:
+                rows.append(row[:len(sync_model.fields)])
+        # Deleted after this page's entries were read; the delete entry follows later
+        deleted[key].extend(object_id for object_id in ids if object_id not in found)
+        if rows:
+            changes[key] = {'fields': sync_model.fields, 'rows': rows}
+
+    return {
+        'token': entries[-1][0] if entries else token,
+        'has_more': has_more,
+        'changes': changes,
+        'deleted': {key: ids for key, ids in deleted.items() if ids},
+    }
@@ -8,4 +8,5 @@ urlpatterns = [
     path('about/', views.AboutView.as_view(), name='about'),
     path('how-it-works/', views.HowItWorksView.as_view(), name='how_it_works'),
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('api/sync/', views.sync_api, name='sync'),
 ]
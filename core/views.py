@@ -1,8 +1,15 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.views.generic import TemplateView
 
+from assessment.etags import make_etag, per_format
+from assessment.pagination import page_size_from_request
+
+from .renderers import api_response
+from .sync import DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT, changes_since, latest_token
+
 
 class HomeView(TemplateView):
     """Home page view with featured content and navigation."""
@@ -66,9 +73,9 @@ class DashboardView(TemplateView):
         recent_assessments = AssessmentResponse.objects.filter(user=user).order_by('-completed_at')[:5]
         context['recent_assessments'] = recent_assessments
         
-        # Get user's assessment history for charts
-        all_assessments = AssessmentResponse.objects.filter(user=user).order_by('completed_at')
-        context['assessment_history'] = all_assessments
+        # Get user's assessment statistics (a single-row rollup)
+        from assessment.stats import get_user_stats
+        context['assessment_stats'] = get_user_stats(user)
         
         # Get video resources (from Resource model)
         from resources.models import Resource
@@ -161,3 +168,37 @@ class DashboardView(TemplateView):
         context['MEDIA_URL'] = settings.MEDIA_URL
         
         return context
+
+
+def _sync_token(request):
+    try:
+        token = int(request.GET.get('since') or 0)
+    except ValueError:
+        return None
+    return token if token >= 0 else None
+
+
+@per_format
+def sync_etag(request):
+    return make_etag('sync', latest_token(), request.GET.get('since', ''), request.GET.get('limit', ''))
+
+
+@condition(etag_func=sync_etag)
+def sync_api(request):
+    """
+    API endpoint for catalog delta sync: the rows changed after ``?since=<token>``.
+
+    Without ``since`` (or with 0) the whole catalog is returned. Clients keep
+    the returned ``token`` for the next sync and call again straight away
+    while ``has_more`` is set. A ``reset`` response means the token is
+    unknown to the server and the client must sync again from 0.
+    """
+    token = _sync_token(request)
+    if token is None:
+        return api_response(request, {'error': 'since must be a non-negative integer token'}, status=400)
+    
+    if token > latest_token():
+        return api_response(request, {'reset': True, 'token': 0})
+    
+    limit = page_size_from_request(request, default=DEFAULT_SYNC_LIMIT, maximum=MAX_SYNC_LIMIT)
+    return api_response(request, changes_since(token, limit), json_dumps_params={'separators': (',', ':')})
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     'accounts',
     'assessment',
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -164,6 +166,18 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.ORJSONParser',
+        'core.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'core.renderers.APIContentNegotiation',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
@@ -183,11 +197,76 @@ X_FRAME_OPTIONS = 'DENY'
 SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_AGE = 1209600  # 2 weeks
+# Sessions are cached and only written to the database once they hold data,
+# so anonymous assessment traffic does not insert a django_session row per visitor.
+SESSION_ENGINE = 'core.session_backend'
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_DB_WRITE_INTERVAL = 60  # seconds between rewrites of an unchanged session
+
+# Caches. LocMemCache is per process: use a shared backend (Redis, Memcached)
+# in production so cache-only anonymous sessions are visible to every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mindcheck-default',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mindcheck-sessions',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'admission': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mindcheck-admission',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
 
 # CSRF settings
 CSRF_COOKIE_SECURE = False  # Set to True in production with HTTPS
 CSRF_COOKIE_HTTPONLY = True
 
+# Assessment write queue (group commit for SQLite write contention).
+# When enabled, run `python manage.py drain_submission_queue` as the single writer.
+ASSESSMENT_WRITE_QUEUE = {
+    'ENABLED': False,
+    'SPOOL_DIR': BASE_DIR / 'var' / 'submission_queue',
+    'BATCH_SIZE': 500,
+}
+
+# Stateless quick assessment: score in memory and carry the result in a signed
+# URL token instead of storing it; logged-in users can save it to their history.
+QUICK_ASSESSMENT_STATELESS = False
+QUICK_RESULT_TOKEN_MAX_AGE = 60 * 60 * 24 * 30  # seconds
+
+# Data retention (applied by `python manage.py apply_retention`, e.g. from cron
+# or with --loop): anonymous assessments are deleted after this many days.
+DATA_RETENTION = {
+    'ANONYMOUS_ASSESSMENT_DAYS': 90,
+    'BATCH_SIZE': 500,
+    'SLEEP_SECONDS': 0.1,
+    'TIME_BUDGET_SECONDS': 60,
+}
+
+# Admission control for write endpoints (core.middleware): per-client token
+# buckets by URL name, plus a cap on concurrent writes per process. Excess
+# requests get 429 with Retry-After.
+ADMISSION_CONTROL = {
+    'CACHE_ALIAS': 'admission',
+    'WRITE_CONCURRENCY': 4,
+    'ADDRESS_BUDGET_FACTOR': 5,
+    'ROUTES': {
+        # URL name: (burst, requests per minute)
+        'accounts:signup': (5, 5),
+        'assessment:take_assessment': (10, 20),
+        'assessment:quick_assessment': (10, 20),
+        'assessment:save_quick_result': (10, 20),
+        'resources:bookmark_resource': (30, 60),
+        'api_v1:bookmark-list': (30, 60),
+        'api_v1:submission_batch': (5, 10),
+    },
+}
+
 # Login/Logout URLs
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
@@ -202,3 +281,24 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For developm
 # EMAIL_USE_TLS = True
 # EMAIL_HOST_USER = 'your-email@example.com'
 # EMAIL_HOST_PASSWORD = 'your-email-password'
+
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'assessment': {
+            'handlers': ['console'],
+            'level': 'INFO' if DEBUG else 'WARNING',
+        },
+        'core': {
+            'handlers': ['console'],
+            'level': 'INFO' if DEBUG else 'WARNING',
+        },
+    },
+}
@@ -25,6 +25,7 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('assessment/', include('assessment.urls')),
     path('resources/', include('resources.urls')),
+    path('api/v1/', include('core.api_urls')),
     path('api/', include('assessment.api_urls')),
 ]
 
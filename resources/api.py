@@ -0,0 +1,87 @@
+"""
+REST API viewsets for resources and bookmarks.
+
+Registered under ``/api/v1/`` by ``core.api_urls``.
+"""
+from django.db.models import Count
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from assessment.pagination import MAX_PAGE_SIZE
+
+from .etags import bookmark_detail_etag, bookmark_list_etag, resource_detail_etag, resource_list_etag
+from .models import Resource, UserBookmark
+from .serializers import ResourceSerializer, UserBookmarkSerializer
+
+RESOURCE_SUMMARY_FIELDS = ('id', 'title', 'resource_type', 'category_id', 'category__name', 'url', 'is_free')
+
+
+class ResourcePagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = MAX_PAGE_SIZE
+
+
+@method_decorator(condition(etag_func=resource_list_etag), name='list')
+@method_decorator(condition(etag_func=resource_detail_etag), name='retrieve')
+class ResourceViewSet(viewsets.ReadOnlyModelViewSet):
+    """Active resources, newest first, filterable with ``?category=<id>`` and ``?type=``."""
+
+    serializer_class = ResourceSerializer
+    pagination_class = ResourcePagination
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        queryset = (
+            Resource.objects.filter(is_active=True)
+            .select_related('category')
+            .annotate(bookmark_count=Count('bookmarks'))
+            .only(*RESOURCE_SUMMARY_FIELDS, 'description', 'phone', 'email', 'address', 'is_verified', 'updated_at')
+        )
+        category = self.request.query_params.get('category')
+        if category and category.isdigit():
+            queryset = queryset.filter(category_id=category)
+        resource_type = self.request.query_params.get('type')
+        if resource_type:
+            queryset = queryset.filter(resource_type=resource_type)
+        return queryset
+
+
+class BookmarkPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = MAX_PAGE_SIZE
+
+
+@method_decorator(condition(etag_func=bookmark_list_etag), name='list')
+@method_decorator(condition(etag_func=bookmark_detail_etag), name='retrieve')
+class UserBookmarkViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.CreateModelMixin,
+                          mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """The logged-in user's bookmarks. Creating an existing bookmark returns it with HTTP 200."""
+
+    serializer_class = UserBookmarkSerializer
+    pagination_class = BookmarkPagination
+
+    def get_queryset(self):
+        return (
+            UserBookmark.objects.filter(user=self.request.user)
+            .select_related('resource__category')
+            .only(
+                'id', 'user_id', 'created_at', 'resource_id',
+                *(f'resource__{name}' for name in RESOURCE_SUMMARY_FIELDS),
+            )
+        )
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        bookmark, created = UserBookmark.objects.get_or_create(
+            user=request.user, resource=serializer.validated_data['resource']
+        )
+        return Response(
+            self.get_serializer(bookmark).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
@@ -0,0 +1,48 @@
+"""
+Version checks for conditional GET on the resources API (see ``assessment.etags``).
+
+Resources embed their category's name and a bookmark count, so a version is
+the catalog's sync token (any resource or category change moves it) plus
+the bookmark count and newest bookmark id.
+"""
+from django.db.models import Count, Max
+
+from assessment.etags import make_etag, per_format
+from core.sync import latest_token
+
+from .models import UserBookmark
+
+
+def _bookmarks_version(**filters):
+    version = UserBookmark.objects.filter(**filters).aggregate(count=Count('id'), latest=Max('id'))
+    return version['count'], version['latest']
+
+
+@per_format
+def resource_list_etag(request):
+    return make_etag(
+        'resources', latest_token(), *_bookmarks_version(),
+        *(request.GET.get(name, '') for name in ('category', 'type', 'cursor', 'limit')),
+    )
+
+
+@per_format
+def resource_detail_etag(request, pk):
+    return make_etag('resource', pk, latest_token(), *_bookmarks_version(resource_id=pk))
+
+
+@per_format
+def bookmark_list_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return make_etag(
+        'bookmarks', request.user.pk, latest_token(), *_bookmarks_version(user_id=request.user.pk),
+        *(request.GET.get(name, '') for name in ('cursor', 'limit')),
+    )
+
+
+@per_format
+def bookmark_detail_etag(request, pk):
+    if not request.user.is_authenticated:
+        return None
+    return make_etag('bookmark', request.user.pk, pk, latest_token(), *_bookmarks_version(user_id=request.user.pk))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userbookmark',
+            index=models.Index(fields=['user', '-created_at'], name='bookmark_user_created_idx'),
+        ),
+    ]
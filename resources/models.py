@@ -137,3 +137,6 @@ class UserBookmark(models.Model):
     class Meta:
         unique_together = ['user', 'resource']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='bookmark_user_created_idx'),
+        ]
@@ -0,0 +1,37 @@
+"""
+Serializers for the REST API.
+
+``category_name`` reads the joined category and ``bookmark_count`` is an
+annotation; the viewsets in ``resources.api`` provide both.
+"""
+from rest_framework import serializers
+
+from .models import Resource, UserBookmark
+
+
+class ResourceSummarySerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = Resource
+        fields = ('id', 'title', 'resource_type', 'category', 'category_name', 'url', 'is_free')
+
+
+class ResourceSerializer(ResourceSummarySerializer):
+    bookmark_count = serializers.IntegerField(read_only=True)
+
+    class Meta(ResourceSummarySerializer.Meta):
+        fields = ResourceSummarySerializer.Meta.fields + (
+            'description', 'phone', 'email', 'address', 'is_verified', 'bookmark_count', 'updated_at',
+        )
+
+
+class UserBookmarkSerializer(serializers.ModelSerializer):
+    resource = ResourceSummarySerializer(read_only=True)
+    resource_id = serializers.PrimaryKeyRelatedField(
+        queryset=Resource.objects.filter(is_active=True), source='resource', write_only=True
+    )
+
+    class Meta:
+        model = UserBookmark
+        fields = ('id', 'resource', 'resource_id', 'created_at')
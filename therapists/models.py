@@ -95,6 +95,9 @@ class Appointment(models.Model):
     
     class Meta:
         ordering = ['-appointment_date']
+        indexes = [
+            models.Index(fields=['user', 'status', 'appointment_date'], name='appointment_user_status_idx'),
+        ]
 
 
 class Article(models.Model):